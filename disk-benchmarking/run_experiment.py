@@ -11,8 +11,11 @@ Usage:
 import os
 import sys
 import json
+import signal
 import subprocess
 import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
@@ -20,6 +23,11 @@ from datetime import datetime
 from utils import (
     log,
     run_cmd,
+    write_json,
+    copy_file,
+    wait_for,
+    prefault_file,
+    ThreadSampler,
     check_root,
     drop_caches,
     compile_mem_locker,
@@ -76,10 +84,13 @@ def run_experiment(settings, paths):
     Returns:
         Path: Results directory
     """
-    # Create results directory with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # Create results directory with timestamp + random suffix so two
+    # experiments starting within the same second never share a
+    # directory; exist_ok=False surfaces any race instead of silently
+    # mixing results
+    timestamp = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
     result_dir = paths['results_dir'] / f"experiment_{timestamp}"
-    result_dir.mkdir(parents=True, exist_ok=True)
+    result_dir.mkdir(parents=True, exist_ok=False)
 
     log(f"Results will be saved to: {result_dir}")
 
@@ -110,48 +121,92 @@ def run_experiment(settings, paths):
         "num_extents": num_extents
     }
 
-    with open(result_dir / "config.json", 'w') as f:
-        json.dump(config, f, indent=2)
+    write_json(result_dir / "config.json", config)
 
     log("Configuration saved")
 
-    # Step 1: Drop caches
-    drop_caches()
+    # Step 1: Drop caches (pagecache + explicit model eviction)
+    drop_caches(model_path)
+
+    # Baseline runs (no memory pressure) generate no swap I/O worth
+    # tracing; skip the blktrace setup/teardown entirely for them
+    enable_blktrace = settings['storage'].get('enable_blktrace', True)
+    mlock_gb = settings['memory']['mlock_size_gb']
 
     # Step 2: Create blktrace staging directory on nvme0n1 (ZERO RAM usage!)
     blktrace_staging = Path(settings['storage']['blktrace_staging'])
-    blktrace_staging.mkdir(parents=True, exist_ok=True)
-    log(f"blktrace staging on nvme0n1: {blktrace_staging} (disk storage, zero RAM interference)")
-
-    # Step 3: Start blktrace
-    log(f"Starting blktrace on {settings['storage']['block_device']}...")
-    blktrace_proc = subprocess.Popen(
-        ["blktrace", "-d", settings['storage']['block_device'], "-o", "trace"],
-        cwd=str(blktrace_staging),
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE
-    )
-    time.sleep(2)
-    log("blktrace running")
-
-    # Step 4: Start mem_locker
-    log(f"Starting mem_locker ({settings['memory']['mlock_size_gb']} GB)...")
-    mlock_log = result_dir / "mlock.log"
-    mlock_proc = subprocess.Popen(
-        [str(paths['mlock_bin']), str(settings['memory']['mlock_size_gb'])],
-        stdout=open(mlock_log, 'w'),
-        stderr=subprocess.STDOUT
-    )
-    time.sleep(5)
-    log("mem_locker running")
+    if enable_blktrace:
+        blktrace_staging.mkdir(parents=True, exist_ok=True)
+        log(f"blktrace staging on nvme0n1: {blktrace_staging} (disk storage, zero RAM interference)")
+
+    # CPU isolation: give llama-cli exclusive cores and pen the
+    # monitoring daemons (blktrace, mem_locker) onto the last core so
+    # they don't steal cycles from the measured inference
+    ncpu = os.cpu_count()
+    if ncpu and ncpu > 1:
+        infer_taskset = ["taskset", "-c", f"0-{ncpu - 2}"]
+        monitor_taskset = ["taskset", "-c", str(ncpu - 1)]
+        log(f"CPU pinning: inference on 0-{ncpu - 2}, monitors on {ncpu - 1}")
+    else:
+        infer_taskset = []
+        monitor_taskset = []
+
+    # The monitor daemons are launched with os.posix_spawnp rather than
+    # subprocess.Popen: posix_spawn uses vfork/CLONE_VM on Linux, so it
+    # avoids forking (and COW-faulting) the whole Python heap right when
+    # the experiment is deliberately squeezing memory. llama-cli below
+    # stays on Popen since we need .wait() with a timeout.
+    def spawn_monitor(argv, logpath):
+        argv = monitor_taskset + argv
+        return os.posix_spawnp(argv[0], argv, os.environ, file_actions=[
+            (os.POSIX_SPAWN_OPEN, 1, str(logpath),
+             os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644),
+            (os.POSIX_SPAWN_DUP2, 1, 2),
+        ])
+
+    # Step 3: Start blktrace (-D replaces cwd=, which posix_spawn lacks)
+    blktrace_pid = None
+    if enable_blktrace:
+        log(f"Starting blktrace on {settings['storage']['block_device']}...")
+        blktrace_pid = spawn_monitor(
+            ["blktrace", "-d", settings['storage']['block_device'],
+             "-D", str(blktrace_staging), "-o", "trace"],
+            result_dir / "blktrace.log"
+        )
+        # Ready as soon as the per-CPU trace files appear (usually <100ms)
+        wait_for(
+            lambda: any(blktrace_staging.glob("trace.blktrace.*")),
+            timeout=5, description="blktrace output files"
+        )
+        log("blktrace running")
+
+    # Step 4: Start mem_locker (skipped for mlock_gb=0 baselines)
+    mlock_pid = None
+    if mlock_gb > 0:
+        log(f"Starting mem_locker ({mlock_gb} GB)...")
+        mlock_log = result_dir / "mlock.log"
+        mlock_pid = spawn_monitor([str(paths['mlock_bin']), str(mlock_gb)], mlock_log)
+        # mem_locker prints "..." once its allocation is touched and locked
+        wait_for(
+            lambda: mlock_log.exists() and "..." in mlock_log.read_text(),
+            timeout=120, description="mem_locker ready marker"
+        )
+        log("mem_locker running")
+
+    # Keep monitor PIDs on disk so a crashed run can still be cleaned up
+    with open(result_dir / "monitor_pids.txt", 'w') as f:
+        for pid in (blktrace_pid, mlock_pid):
+            if pid is not None:
+                f.write(f"{pid}\n")
 
     # Step 5: Capture memory state BEFORE inference
     log("Capturing pre-inference memory state...")
-    mem_before = run_cmd("free -b", capture=True)
+    write_json(result_dir / "memory_before.json", read_memory_snapshot())
 
-    with open(result_dir / "memory_before.txt", 'w') as f:
-        f.write("=== free -b ===\n")
-        f.write(mem_before + "\n")
+    # Optional: pre-warm the model into page cache (warm-cache runs only;
+    # leave disabled for the cold-cache I/O measurements)
+    if settings['experiment'].get('prefault_model', False):
+        prefault_file(model_path)
 
     # Step 6: Run llama-cli inference (capture PID)
     log(f"Running llama-cli inference ({settings['experiment']['tokens_to_generate']} tokens)...")
@@ -161,7 +216,7 @@ def run_experiment(settings, paths):
 
     # Start llama-cli as subprocess (non-blocking to capture PID)
     llama_proc = subprocess.Popen(
-        [
+        infer_taskset + [
             str(paths['llama_cli']),
             "-m", str(model_path),
             "-p", settings['experiment']['prompt'],
@@ -180,6 +235,10 @@ def run_experiment(settings, paths):
     with open(result_dir / "llama_pid.txt", 'w') as f:
         f.write(str(llama_pid))
 
+    # Sample per-thread CPU usage via /proc (no shell, no ps forks)
+    sampler = ThreadSampler(llama_pid, result_dir / "thread_usage.log", interval=2)
+    sampler.start()
+
     # Wait for completion
     try:
         llama_proc.wait(timeout=3600)
@@ -202,13 +261,12 @@ def run_experiment(settings, paths):
         tokens_per_sec = 0
         inference_success = False
 
+    # Stop thread sampler
+    sampler.stop()
+
     # Step 7: Capture memory state AFTER inference
     log("Capturing post-inference memory state...")
-    mem_after = run_cmd("free -b", capture=True)
-
-    with open(result_dir / "memory_after.txt", 'w') as f:
-        f.write("=== free -b ===\n")
-        f.write(mem_after + "\n")
+    write_json(result_dir / "memory_after.json", read_memory_snapshot())
 
     # Save performance metrics (will add blktrace_size later)
     metrics = {
@@ -219,45 +277,45 @@ def run_experiment(settings, paths):
         "llama_pid": llama_pid
     }
 
-    with open(result_dir / "performance.json", 'w') as f:
-        json.dump(metrics, f, indent=2)
+    write_json(result_dir / "performance.json", metrics)
 
-    # Step 8: Stop blktrace
-    log("Stopping blktrace...")
-    run_cmd("killall blktrace", check=False)
-    time.sleep(2)
+    # Step 8: Stop blktrace (SIGINT makes it flush and exit cleanly)
+    if blktrace_pid is not None:
+        log("Stopping blktrace...")
+        run_cmd(["killall", "blktrace"], check=False)
+        os.waitpid(blktrace_pid, 0)
 
     # Step 9: Stop mem_locker
-    log("Stopping mem_locker...")
-    mlock_proc.terminate()
-    try:
-        mlock_proc.wait(timeout=5)
-    except:
-        mlock_proc.kill()
+    if mlock_pid is not None:
+        log("Stopping mem_locker...")
+        os.kill(mlock_pid, signal.SIGTERM)
+        os.waitpid(mlock_pid, 0)
 
     log("All processes stopped")
 
     # Step 10: Copy blktrace files from nvme0n1 staging to results
-    log("Copying blktrace data from nvme0n1 staging to results...")
-    blktrace_dest = result_dir / "blktrace"
-    blktrace_dest.mkdir(exist_ok=True)
-
-    trace_files = list(blktrace_staging.glob("trace.blktrace.*"))
-
-    if not trace_files:
-        log("WARNING: No blktrace files found!")
-        total_blktrace_bytes = 0
-    else:
-        log(f"Found {len(trace_files)} blktrace files")
-        total_blktrace_bytes = 0
-        for trace_file in trace_files:
-            file_size = trace_file.stat().st_size
-            total_blktrace_bytes += file_size
-            run_cmd(f"cp {trace_file} {blktrace_dest}/")
+    trace_files = []
+    total_blktrace_bytes = 0
+    if enable_blktrace:
+        log("Copying blktrace data from nvme0n1 staging to results...")
+        blktrace_dest = result_dir / "blktrace"
+        blktrace_dest.mkdir(exist_ok=True)
+
+        trace_files = list(blktrace_staging.glob("trace.blktrace.*"))
+
+        # Missing files are only suspicious when tracing actually ran
+        if not trace_files:
+            log("WARNING: No blktrace files found!")
+        else:
+            log(f"Found {len(trace_files)} blktrace files")
+            for trace_file in trace_files:
+                file_size = trace_file.stat().st_size
+                total_blktrace_bytes += file_size
+                copy_file(trace_file, blktrace_dest / trace_file.name)
 
-        total_blktrace_gb = total_blktrace_bytes / (1024 ** 3)
-        log(f"Blktrace files saved to {blktrace_dest}")
-        log(f"Total blktrace size: {total_blktrace_gb:.4f} GB ({total_blktrace_bytes / (1024**2):.2f} MB)")
+            total_blktrace_gb = total_blktrace_bytes / (1024 ** 3)
+            log(f"Blktrace files saved to {blktrace_dest}")
+            log(f"Total blktrace size: {total_blktrace_gb:.4f} GB ({total_blktrace_bytes / (1024**2):.2f} MB)")
 
     # Update performance.json with blktrace size
     perf_file = result_dir / "performance.json"
@@ -267,14 +325,14 @@ def run_experiment(settings, paths):
         perf_data["blktrace_size_bytes"] = total_blktrace_bytes
         perf_data["blktrace_size_mb"] = total_blktrace_bytes / (1024 ** 2)
         perf_data["blktrace_size_gb"] = total_blktrace_bytes / (1024 ** 3)
-        with open(perf_file, 'w') as f:
-            json.dump(perf_data, f, indent=2)
+        write_json(perf_file, perf_data)
 
     # Step 11: Clean up staging directory
-    log("Cleaning up blktrace staging directory...")
-    for trace_file in blktrace_staging.glob("trace.blktrace.*"):
-        trace_file.unlink()
-    log("Staging directory cleaned")
+    if enable_blktrace:
+        log("Cleaning up blktrace staging directory...")
+        for trace_file in blktrace_staging.glob("trace.blktrace.*"):
+            trace_file.unlink()
+        log("Staging directory cleaned")
 
     log(f"\n{'='*70}")
     log(f"Experiment complete! Results in: {result_dir}")
@@ -283,91 +341,86 @@ def run_experiment(settings, paths):
     return result_dir
 
 
-def parse_memory_snapshot(filepath):
-    """Extract memory stats from free output
+def read_memory_snapshot():
+    """Snapshot system memory stats straight from /proc/meminfo
 
-    Args:
-        filepath: Path to memory snapshot file
+    Replaces the `free -b` subprocess + text file + line-scan parser:
+    no forks, no intermediate file. Fields mirror free(1)'s accounting
+    (cache includes SReclaimable, used = total - free - buffers - cache).
 
     Returns:
-        dict: Memory statistics or None if parsing fails
+        dict: Memory statistics in GB
     """
-    with open(filepath) as f:
-        lines = f.readlines()
-
-    # Parse "free -b" output
-    for line in lines:
-        if line.startswith('Mem:'):
-            parts = line.split()
-            total = int(parts[1])
-            used = int(parts[2])
-            free = int(parts[3])
-            shared = int(parts[4])
-            cache = int(parts[5])
-            available = int(parts[6])
-
-            return {
-                'total_gb': total / 1024**3,
-                'used_gb': used / 1024**3,
-                'free_gb': free / 1024**3,
-                'cache_gb': cache / 1024**3,
-                'available_gb': available / 1024**3
-            }
-
-    return None
-
+    info = {}
+    with open('/proc/meminfo') as f:
+        for line in f:
+            key, rest = line.split(':', 1)
+            info[key] = int(rest.split()[0]) * 1024  # kB -> bytes
+
+    cache = info.get('Cached', 0) + info.get('SReclaimable', 0)
+    used = info['MemTotal'] - info['MemFree'] - info.get('Buffers', 0) - cache
+
+    return {
+        'total_gb': info['MemTotal'] / 1024**3,
+        'used_gb': used / 1024**3,
+        'free_gb': info['MemFree'] / 1024**3,
+        'cache_gb': cache / 1024**3,
+        'available_gb': info.get('MemAvailable', 0) / 1024**3
+    }
 
-def main():
-    """Main entry point"""
 
-    print("  LLM Parameter Offloading Experiment")
+def analyze_results(result_dir, settings):
+    """Post-process one experiment's results (CSV, DuckDB, memory stats)
 
-    # Check root
-    check_root()
+    Pure post-processing - touches only files under result_dir, so it is
+    safe to run in a background worker while the next experiment's setup
+    and inference proceed.
 
-    # Load settings
-    settings = load_settings()
-
-    # Resolve paths
-    paths = resolve_paths(settings)
-
-    # Compile mem_locker if needed
-    compile_mem_locker(paths['mlock_bin'], paths['mlock_tool_cpp'])
-
-    # Run experiment
-    result_dir = run_experiment(settings, paths)
-
-    # Convert blktrace to CSV
+    Args:
+        result_dir: Results directory from run_experiment
+        settings: Settings dictionary
+    """
+    # Convert blktrace to CSV (baselines without tracing skip straight
+    # to the memory metrics)
     blktrace_dir = result_dir / "blktrace"
 
-    csv_path = result_dir / "blktrace.csv"
-    blktrace_to_csv(blktrace_dir, csv_path, result_dir)
-
-    # Read GGUF sector range from config (saved during run_experiment)
-    config_path = result_dir / "config.json"
-    with open(config_path, 'r') as f:
-        config = json.load(f)
-
-    gguf_start_sector = config['gguf_start_sector']
-    gguf_end_sector = config['gguf_end_sector']
-    num_extents = config['num_extents']
-
-    # Analyze with DuckDB (using sector range from config)
-    analyze_with_duckdb(
-        csv_path,
-        result_dir,
-        settings['analysis']['gap_small_sectors'],
-        settings['analysis']['gap_medium_sectors'],
-        gguf_start_sector,
-        gguf_end_sector,
-        num_extents
-    )
+    has_trace = blktrace_dir.exists() and any(blktrace_dir.glob("trace.blktrace.*"))
+
+    if has_trace:
+        csv_path = result_dir / "blktrace.csv"
+        blktrace_to_csv(blktrace_dir, csv_path, result_dir)
+
+        # Read GGUF sector range from config (saved during run_experiment)
+        config_path = result_dir / "config.json"
+        with open(config_path, 'r') as f:
+            config = json.load(f)
+
+        gguf_start_sector = config['gguf_start_sector']
+        gguf_end_sector = config['gguf_end_sector']
+        num_extents = config['num_extents']
+
+        # Analyze with DuckDB (using sector range from config). The CSV
+        # is parsed once: the same in-memory table feeds both the
+        # analysis and the Parquet+zstd archive that replaces the CSV.
+        analyze_with_duckdb(
+            csv_path,
+            result_dir,
+            settings['analysis']['gap_small_sectors'],
+            settings['analysis']['gap_medium_sectors'],
+            gguf_start_sector,
+            gguf_end_sector,
+            num_extents
+        )
+    else:
+        log("No blktrace data to analyze (tracing disabled or no I/O)")
 
     # Parse memory files for page cache metrics
     log("\nExtracting memory usage from snapshots...")
 
-    mem_before = parse_memory_snapshot(result_dir / "memory_before.txt")
-    mem_after = parse_memory_snapshot(result_dir / "memory_after.txt")
+    with open(result_dir / "memory_before.json") as f:
+        mem_before = json.load(f)
+    with open(result_dir / "memory_after.json") as f:
+        mem_after = json.load(f)
 
     if mem_before and mem_after:
         cache_delta = mem_after['cache_gb'] - mem_before['cache_gb']
@@ -390,11 +443,43 @@ def main():
                 "method_b_unique_sectors_mb": analysis.get("unique_mb", 0)
             }
 
-            with open(analysis_file, 'w') as f:
-                json.dump(analysis, f, indent=2)
+            write_json(analysis_file, analysis)
 
             log("Memory metrics added to analysis.json")
 
+
+def main():
+    """Main entry point"""
+
+    print("  LLM Parameter Offloading Experiment")
+
+    # Check root
+    check_root()
+
+    # Load settings
+    settings = load_settings()
+
+    # Resolve paths
+    paths = resolve_paths(settings)
+
+    # Compile mem_locker if needed
+    compile_mem_locker(paths['mlock_bin'], paths['mlock_tool_cpp'])
+
+    # Run experiment, then post-process in background workers. With a
+    # single experiment this just decouples the phases; when looping
+    # over multiple experiments, analysis of run N overlaps setup and
+    # inference of run N+1 (analysis only touches result_dir files).
+    # DuckDB parallelizes the aggregation inside each worker.
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        analysis_futures = []
+
+        result_dir = run_experiment(settings, paths)
+        analysis_futures.append(executor.submit(analyze_results, result_dir, settings))
+
+        # Drain all queued analyses only at the very end
+        for future in analysis_futures:
+            future.result()
+
     print("\n" + "="*70)
     print(f"  ALL COMPLETE! Results in: {result_dir}")
     print("="*70 + "\n")
@@ -5,9 +5,17 @@ Utility modules for LLM parameter offloading experiments
 from .setup_tools import (
     log,
     run_cmd,
+    write_json,
+    copy_file,
+    wait_for,
+    prefault_file,
+    ThreadSampler,
     check_root,
     drop_caches,
     compile_mem_locker,
+    get_backing_device,
+    create_swap_file,
+    remove_swap_file,
     mount_dedicated_tmpfs,
     unmount_dedicated_tmpfs
 )
@@ -15,18 +23,28 @@ from .setup_tools import (
 from .analysis_tools import (
     get_gguf_sector_range,
     blktrace_to_csv,
+    convert_csv_to_parquet,
     analyze_with_duckdb
 )
 
 __all__ = [
     'log',
     'run_cmd',
+    'write_json',
+    'copy_file',
+    'wait_for',
+    'prefault_file',
+    'ThreadSampler',
     'check_root',
     'drop_caches',
     'compile_mem_locker',
+    'get_backing_device',
+    'create_swap_file',
+    'remove_swap_file',
     'mount_dedicated_tmpfs',
     'unmount_dedicated_tmpfs',
     'get_gguf_sector_range',
     'blktrace_to_csv',
+    'convert_csv_to_parquet',
     'analyze_with_duckdb'
 ]
@@ -10,9 +10,16 @@ Includes:
 """
 
 import json
+import os
 import re
+import subprocess
 from pathlib import Path
-from .setup_tools import log, run_cmd
+from .setup_tools import log, run_cmd, write_json
+
+# filefrag -v extent line, e.g. "  0:   0.. 4095: 128862208.. 128866303:  4096:"
+# Compiled once at import; MULTILINE so finditer sweeps the whole
+# filefrag output in one pass instead of splitting into lines first
+_EXTENT_RE = re.compile(r'^\s*\d+:\s+\d+\.\.\s*\d+:\s+(\d+)\.\.\s*(\d+):\s+\d+:', re.MULTILINE)
 
 
 def get_gguf_sector_range(model_path):
@@ -34,19 +41,14 @@ def get_gguf_sector_range(model_path):
     log(f"Detecting GGUF sector range for {model_path.name}...")
 
     # Run filefrag -v to get extent information
-    result = run_cmd(f"filefrag -v {model_path}", capture=True)
-
-    # Parse output to find physical extents
-    # Format: "  0:   0.. 4095: 128862208.. 128866303:  4096:"
-    extent_pattern = r'^\s*\d+:\s+\d+\.\.\s*\d+:\s+(\d+)\.\.\s*(\d+):\s+\d+:'
+    result = run_cmd(["filefrag", "-v", str(model_path)], capture=True)
 
-    extents = []
-    for line in result.split('\n'):
-        match = re.search(extent_pattern, line)
-        if match:
-            start_block = int(match.group(1))
-            end_block = int(match.group(2))
-            extents.append((start_block, end_block))
+    # Parse output to find physical extents (single regex sweep - no
+    # per-line split/search, no intermediate line list)
+    extents = [
+        (int(m.group(1)), int(m.group(2)))
+        for m in _EXTENT_RE.finditer(result)
+    ]
 
     if not extents:
         raise ValueError(f"Failed to parse filefrag output for {model_path}")
@@ -54,26 +56,21 @@ def get_gguf_sector_range(model_path):
     # Sort extents by physical start block
     extents.sort(key=lambda x: x[0])
 
-    # Merge adjacent extents (where end+1 == next_start)
-    merged_extents = []
-    current_start, current_end = extents[0]
+    # Only the overall range and the merged-extent count matter, so
+    # count gap boundaries in one pass instead of materializing the
+    # merged list (same as filefrag's summary count of extents)
+    num_extents = 1
+    current_end = extents[0][1]
+    max_block = extents[0][1]
 
     for start, end in extents[1:]:
-        if start == current_end + 1:
-            # Adjacent extent, merge it
-            current_end = end
-        else:
-            # Gap found, save current extent and start new one
-            merged_extents.append((current_start, current_end))
-            current_start, current_end = start, end
-
-    # Don't forget the last extent
-    merged_extents.append((current_start, current_end))
+        if start != current_end + 1:
+            num_extents += 1
+        current_end = end
+        if end > max_block:
+            max_block = end
 
-    # Get overall range
-    min_block = merged_extents[0][0]
-    max_block = merged_extents[-1][1]
-    num_extents = len(merged_extents)
+    min_block = extents[0][0]
 
     # Convert blocks (4096 bytes) to sectors (512 bytes)
     # 1 block = 8 sectors
@@ -87,11 +84,22 @@ def get_gguf_sector_range(model_path):
     return (min_sector, max_sector, num_extents)
 
 
+# Fixed-column blkparse output format - emits CSV rows directly, so no
+# Python tokenization pass over millions of trace lines is needed.
+# Columns match analyze_with_duckdb's expected schema:
+# device_major,device_minor,cpu,seq,timestamp,pid,action,rwbs,sector,size_sectors,size_bytes,process
+BLKPARSE_CSV_FORMAT = r"%M,%m,%c,%s,%T.%t,%p,%a,%d,%S,%n,%N,%C\n"
+
+CSV_HEADER = "device_major,device_minor,cpu,seq,timestamp,pid,action,rwbs,sector,size_sectors,size_bytes,process"
+
+
 def blktrace_to_csv(blktrace_dir, output_csv, result_dir):
     """Convert blktrace binary files to CSV with all columns
 
-    blkparse output format:
-    major,minor cpu seq timestamp pid action rwbs sector + size [process]
+    Uses blkparse's -f fixed-column formatting to emit CSV rows directly
+    instead of parsing blkparse's default text output line-by-line in
+    Python. The tokenization happens in blkparse's C code; the only
+    Python work left is writing the header.
 
     CSV columns:
     device_major,device_minor,cpu,seq,timestamp,pid,action,rwbs,sector,size_sectors,size_bytes,process
@@ -104,77 +112,113 @@ def blktrace_to_csv(blktrace_dir, output_csv, result_dir):
     Returns:
         Path: output CSV file path
     """
-    log("Converting blktrace to CSV...")
-
-    # Run blkparse
-    blkparse_output = result_dir / "blkparse_raw.txt"
-
-    run_cmd(
-        f"blkparse -i {blktrace_dir}/trace -o {blkparse_output}",
-        check=True
-    )
-
-    log(f"blkparse complete, parsing to CSV...")
-
-    # Parse to CSV
-    csv_lines = []
-    csv_lines.append("# Columns: device_major,device_minor,cpu,seq,timestamp,pid,action,rwbs,sector,size_sectors,size_bytes,process")
-    csv_lines.append("device_major,device_minor,cpu,seq,timestamp,pid,action,rwbs,sector,size_sectors,size_bytes,process")
-
-    with open(blkparse_output, 'r') as f:
-        for line in f:
-            parts = line.split()
-
-            # Skip header/summary lines
-            if len(parts) < 10:
-                continue
-
-            # Skip non-I/O lines
-            if parts[0] == "CPU" or parts[0] == "Total":
-                continue
-
-            try:
-                # Device is "major,minor" - split it
-                device_parts = parts[0].split(',')
-                device_major = device_parts[0]
-                device_minor = device_parts[1] if len(device_parts) > 1 else "0"
-
-                cpu = parts[1]
-                seq = parts[2]
-                timestamp = parts[3]
-                pid = parts[4]
-                action = parts[5]
-                rwbs = parts[6]
-                sector = parts[7]
-                # parts[8] is "+"
-                size_sectors = parts[9]
-                size_bytes = int(size_sectors) * 512
-
-                # Process name is optional, in [brackets]
-                process = ""
-                if len(parts) > 10:
-                    # Find [process]
-                    for i in range(10, len(parts)):
-                        if parts[i].startswith('[') and parts[i].endswith(']'):
-                            process = parts[i][1:-1]  # Remove brackets
-                            break
-
-                csv_line = f"{device_major},{device_minor},{cpu},{seq},{timestamp},{pid},{action},{rwbs},{sector},{size_sectors},{size_bytes},{process}"
-                csv_lines.append(csv_line)
-
-            except (ValueError, IndexError):
-                # Skip malformed lines
-                continue
-
-    # Write CSV
-    with open(output_csv, 'w') as f:
-        f.write('\n'.join(csv_lines))
-
-    log(f"CSV saved: {output_csv} ({len(csv_lines)-2} rows)")
+    log("Converting blktrace to CSV (blkparse fixed-column format)...")
+
+    # One descriptor, opened with a 1 MiB buffer: Python writes the
+    # header through it, then blkparse inherits the same fd for its
+    # stdout - no shell redirect reopening the file.
+    with open(output_csv, 'w', buffering=1 << 20) as f:
+        f.write(f"# Columns: {CSV_HEADER}\n")
+        f.write(CSV_HEADER + "\n")
+        f.flush()
+
+        # blkparse emits one CSV row per trace event; -q suppresses the
+        # trailing statistics summary so only well-formed rows reach
+        # the file (ignore_errors on load stays as a belt-and-braces).
+        # The issue act-mask keeps non-'D' events (queue, complete,
+        # plug, ...) - the majority of the trace, and rows the analysis
+        # filters out anyway - from ever being formatted or stored; the
+        # raw binary trace in result_dir still has everything.
+        subprocess.run(
+            ["blkparse", "-q", "-a", "issue",
+             "-i", f"{blktrace_dir}/trace", "-f", BLKPARSE_CSV_FORMAT],
+            stdout=f, check=True
+        )
+
+    # Report size from a stat() instead of counting rows - counting
+    # would mean re-reading the file we just streamed out
+    csv_mb = Path(output_csv).stat().st_size / (1024 ** 2)
+    log(f"CSV saved: {output_csv} ({csv_mb:.2f} MB)")
 
     return output_csv
 
 
+# DuckDB read_csv() options for the blktrace CSV (skip=1 drops the
+# leading comment line). Shared by analysis and Parquet conversion.
+TRACE_READ_CSV = """read_csv(
+    '{csv_path}',
+    skip=1,
+    header=true,
+    delim=',',
+    columns={{
+        'device_major': 'INTEGER',
+        'device_minor': 'INTEGER',
+        'cpu': 'INTEGER',
+        'seq': 'INTEGER',
+        'timestamp': 'DOUBLE',
+        'pid': 'INTEGER',
+        'action': 'VARCHAR',
+        'rwbs': 'VARCHAR',
+        'sector': 'BIGINT',
+        'size_sectors': 'INTEGER',
+        'size_bytes': 'BIGINT',
+        'process': 'VARCHAR'
+    }},
+    ignore_errors=true
+)"""
+
+# One in-memory DuckDB connection shared across analyses in the same
+# process - connection setup and planner state are reused when several
+# result dirs are analyzed back to back. Lazy so the module imports
+# cleanly without duckdb installed.
+_DUCKDB_CON = None
+
+
+def _duckdb_connect(duckdb):
+    global _DUCKDB_CON
+    if _DUCKDB_CON is None:
+        _DUCKDB_CON = duckdb.connect()
+        # Be explicit about parallelism rather than trusting the
+        # default - aggregation and Parquet encode both scale with it
+        _DUCKDB_CON.execute(f"PRAGMA threads={os.cpu_count()}")
+    return _DUCKDB_CON
+
+
+def convert_csv_to_parquet(csv_path, result_dir):
+    """Convert blktrace CSV to zstd-compressed Parquet and drop the CSV
+
+    Parquet+zstd is typically 10-20x smaller than the raw CSV, so the
+    archived results are much cheaper to store and copy off the
+    experiment host. DuckDB also reads Parquet faster than CSV.
+
+    Args:
+        csv_path: Path to blktrace CSV file
+        result_dir: Results directory for the Parquet file
+
+    Returns:
+        Path: Parquet file path (or original CSV path if duckdb missing)
+    """
+    try:
+        import duckdb
+    except ImportError:
+        log("WARNING: duckdb not installed, keeping CSV (no Parquet conversion)")
+        return csv_path
+
+    parquet_path = result_dir / "blktrace.parquet"
+    log(f"Converting CSV to Parquet (zstd): {parquet_path}")
+
+    duckdb.sql(f"""
+        COPY (SELECT * FROM {TRACE_READ_CSV.format(csv_path=csv_path)})
+        TO '{parquet_path}' (FORMAT PARQUET, COMPRESSION ZSTD, ROW_GROUP_SIZE 1000000)
+    """)
+
+    # CSV is redundant once the Parquet exists
+    Path(csv_path).unlink()
+    log(f"Parquet saved, CSV removed ({parquet_path.stat().st_size / (1024**2):.2f} MB)")
+
+    return parquet_path
+
+
 def analyze_with_duckdb(csv_path, result_dir, gap_small, gap_medium, gguf_start_sector, gguf_end_sector, num_extents):
     """Analyze blktrace CSV with DuckDB
 
@@ -205,68 +249,133 @@ def analyze_with_duckdb(csv_path, result_dir, gap_small, gap_medium, gguf_start_
         config = json.load(f)
     model_size_gb = config["model_size_gb"]
 
+    # Memoize on the surviving trace artifact plus analysis
+    # parameters: re-running analysis (e.g. while iterating on
+    # plotting scripts) is a no-op when nothing that feeds
+    # analysis.json has changed. The CSV is consumed into the Parquet
+    # archive during analysis, so the key names the Parquet — the file
+    # a re-run actually reads — never the transient CSV.
+    trace_path = Path(csv_path)
+    parquet_path = (trace_path if str(csv_path).endswith('.parquet')
+                    else result_dir / "blktrace.parquet")
+    if not trace_path.exists():
+        # The CSV from a previous run was already consumed; fall back
+        # to the archived Parquet
+        if parquet_path.exists():
+            trace_path = parquet_path
+        else:
+            log(f"ERROR: trace not found: {csv_path} (and no Parquet archive)")
+            return
+
+    params = {
+        "gap_small": gap_small,
+        "gap_medium": gap_medium,
+        "gguf_start_sector": gguf_start_sector,
+        "gguf_end_sector": gguf_end_sector,
+    }
+    analysis_file = result_dir / "analysis.json"
+    # A fresh CSV always means new data; the cache can only hit when
+    # the input is the archived Parquet itself
+    if trace_path == parquet_path and analysis_file.exists():
+        parquet_stat = parquet_path.stat()
+        expected = {
+            "trace": str(parquet_path),
+            "trace_mtime": parquet_stat.st_mtime,
+            "trace_size": parquet_stat.st_size,
+            **params,
+        }
+        with open(analysis_file, 'r') as f:
+            previous = json.load(f)
+        if previous.get("inputs") == expected:
+            log("Analysis up to date (same trace and parameters), skipping")
+            return
+
     log("Analyzing with DuckDB...")
 
-    con = duckdb.connect()
+    con = _duckdb_connect(duckdb)
 
-    # Load CSV (skip comment line)
-    con.execute(f"""
-        CREATE TABLE trace AS
-        SELECT * FROM read_csv(
-            '{csv_path}',
-            skip=1,
-            header=true,
-            delim=',',
-            columns={{
-                'device_major': 'INTEGER',
-                'device_minor': 'INTEGER',
-                'cpu': 'INTEGER',
-                'seq': 'INTEGER',
-                'timestamp': 'DOUBLE',
-                'pid': 'INTEGER',
-                'action': 'VARCHAR',
-                'rwbs': 'VARCHAR',
-                'sector': 'BIGINT',
-                'size_sectors': 'INTEGER',
-                'size_bytes': 'BIGINT',
-                'process': 'VARCHAR'
-            }},
-            ignore_errors=true
-        )
-    """)
+    # No intermediate full-trace table: the CSV is parsed once (COPY
+    # streams it straight into the Parquet archive), and the filtered
+    # reads table is built from the Parquet, where the WHERE clause
+    # benefits from columnar scan + predicate pushdown. Irrelevant rows
+    # never get materialized in RAM.
+    if trace_path != parquet_path:
+        con.execute(f"""
+            COPY (SELECT * FROM {TRACE_READ_CSV.format(csv_path=trace_path)})
+            TO '{parquet_path}'
+            (FORMAT PARQUET, COMPRESSION ZSTD, ROW_GROUP_SIZE 1000000)
+        """)
+        trace_path.unlink()
+        log(f"Parquet archived, CSV removed ({parquet_path.stat().st_size / (1024**2):.2f} MB)")
+    trace_src = f"read_parquet('{parquet_path}')"
+
+    # Record the post-conversion Parquet identity; this is what the
+    # cache check compares against on the next run
+    parquet_stat = parquet_path.stat()
+    inputs = {
+        "trace": str(parquet_path),
+        "trace_mtime": parquet_stat.st_mtime,
+        "trace_size": parquet_stat.st_size,
+        **params,
+    }
 
-    # Read llama-cli PID from saved file
+    # Read llama-cli PID from saved file. Fail fast if it is missing:
+    # the connection is shared across analyses in this process, so a
+    # leftover reads table from a previous result dir would otherwise
+    # be silently reused and the prior experiment's numbers written out.
     pid_file = result_dir / "llama_pid.txt"
-    if pid_file.exists():
-        llama_pid = int(pid_file.read_text().strip())
-        log(f"Filtering for llama-cli PID: {llama_pid}")
+    if not pid_file.exists():
+        log(f"ERROR: {pid_file} not found, cannot filter trace by PID")
+        return
+    llama_pid = int(pid_file.read_text().strip())
+    log(f"Filtering for llama-cli PID: {llama_pid}")
 
-        # Use dynamic .gguf file sector range (from get_gguf_sector_range)
-        log(f"Filtering for .gguf sectors: {gguf_start_sector:,} to {gguf_end_sector:,} ({num_extents} extents)")
+    # Use dynamic .gguf file sector range (from get_gguf_sector_range)
+    log(f"Filtering for .gguf sectors: {gguf_start_sector:,} to {gguf_end_sector:,} ({num_extents} extents)")
 
-        # Filter for reads from llama-cli AND within .gguf sector range
-        con.execute(f"""
-            CREATE TABLE reads AS
-            SELECT * FROM trace
-            WHERE action = 'D' AND rwbs LIKE '%R%'
-            AND pid = {llama_pid}
-            AND sector >= {gguf_start_sector}
-            AND sector <= {gguf_end_sector}
-            ORDER BY timestamp
-        """)
-    total_rows = con.execute("SELECT COUNT(*) FROM reads").fetchone()[0]
+    # Filter for reads from llama-cli AND within .gguf sector range
+    con.execute(f"""
+        CREATE OR REPLACE TABLE reads AS
+        SELECT * FROM {trace_src}
+        WHERE action = 'D' AND rwbs LIKE '%R%'
+        AND pid = ?
+        AND sector >= ?
+        AND sector <= ?
+        ORDER BY timestamp
+    """, [llama_pid, gguf_start_sector, gguf_end_sector])
+    # One scan over reads yields the totals AND the gap buckets: the
+    # LAG window derives each read's gap from its predecessor, and the
+    # conditional aggregates reduce everything in the same pass.
+    (total_rows, total_bytes,
+     perfect, small, medium, large, backward, total_gaps) = con.execute(f"""
+        WITH r AS (
+            SELECT
+                size_bytes,
+                sector - (LAG(sector) OVER w + LAG(size_sectors) OVER w) AS gap
+            FROM reads
+            WINDOW w AS (ORDER BY timestamp)
+        )
+        SELECT
+            COUNT(*),
+            COALESCE(SUM(size_bytes), 0),
+            SUM(CASE WHEN gap = 0 THEN 1 ELSE 0 END),
+            SUM(CASE WHEN gap > 0 AND gap < ? THEN 1 ELSE 0 END),
+            SUM(CASE WHEN gap >= ? AND gap < ? THEN 1 ELSE 0 END),
+            SUM(CASE WHEN gap >= ? THEN 1 ELSE 0 END),
+            SUM(CASE WHEN gap < 0 THEN 1 ELSE 0 END),
+            COUNT(gap)
+        FROM r
+    """, [gap_small, gap_small, gap_medium, gap_medium]).fetchone()
     log(f"Total read operations: {total_rows:,}")
 
     if total_rows == 0:
         log("WARNING: No read operations found in blktrace!")
-        con.close()
         return
 
     # ========================================================================
     # Metric 1: Total bytes read (Amount swapped - Method A)
     # ========================================================================
 
-    total_bytes = con.execute("SELECT SUM(size_bytes) FROM reads").fetchone()[0]
     total_mb = total_bytes / (1024 * 1024)
     total_gb = total_bytes / (1024 * 1024 * 1024)
 
@@ -276,22 +385,47 @@ def analyze_with_duckdb(csv_path, result_dir, gap_small, gap_medium, gguf_start_
     # Metric 2: Unique sectors accessed (Amount swapped - Method B)
     # ========================================================================
 
-    log("Calculating unique sectors accessed (expanding all ranges)...")
+    log("Calculating unique sectors accessed (interval merge)...")
 
-    # CRITICAL FIX: Properly count unique sectors by expanding each read's range
-    # Each read covers [sector, sector+size_sectors-1]
-    # We must expand all ranges and count DISTINCT sectors
-
-    # Method: Use generate_series to expand each read into individual sectors
+    # Each read covers the half-open interval [sector, sector+size_sectors).
+    # Instead of expanding every read into its individual sectors with
+    # generate_series (billions of rows for large traces) and hashing a
+    # DISTINCT over them, merge overlapping/adjacent intervals and sum
+    # their widths: O(N log N) on the number of reads, same answer.
+    # (A bitmap over sector offsets would also avoid the expansion, but
+    # needs either ~hundreds of MB for a plain bool array or an extra
+    # dependency like pyroaring; the merge stays inside DuckDB.)
     unique_sectors_query = """
-        WITH expanded_sectors AS (
-            SELECT UNNEST(
-                generate_series(sector, sector + size_sectors - 1)
-            ) AS sector_num
+        WITH intervals AS (
+            SELECT
+                sector AS lo,
+                sector + size_sectors AS hi
             FROM reads
+        ),
+        marked AS (
+            SELECT
+                lo,
+                hi,
+                MAX(hi) OVER (
+                    ORDER BY lo
+                    ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+                ) AS prev_hi
+            FROM intervals
+        ),
+        grouped AS (
+            SELECT
+                lo,
+                hi,
+                SUM(CASE WHEN prev_hi IS NULL OR lo > prev_hi THEN 1 ELSE 0 END)
+                    OVER (ORDER BY lo) AS grp
+            FROM marked
+        )
+        SELECT COALESCE(SUM(span), 0) AS unique_count
+        FROM (
+            SELECT MAX(hi) - MIN(lo) AS span
+            FROM grouped
+            GROUP BY grp
         )
-        SELECT COUNT(DISTINCT sector_num) AS unique_count
-        FROM expanded_sectors
     """
 
     unique_sectors = con.execute(unique_sectors_query).fetchone()[0]
@@ -307,46 +441,13 @@ def analyze_with_duckdb(csv_path, result_dir, gap_small, gap_medium, gguf_start_
     # Metric 3: Gap distribution analysis
     # ========================================================================
 
-    log("Calculating gap distribution...")
-
-    # Create table with gaps
-    con.execute(f"""
-        CREATE TABLE gaps AS
-        WITH ordered_reads AS (
-            SELECT
-                sector,
-                size_sectors,
-                LAG(sector) OVER (ORDER BY timestamp) as prev_sector,
-                LAG(size_sectors) OVER (ORDER BY timestamp) as prev_size
-            FROM reads
-        )
-        SELECT
-            sector - (prev_sector + prev_size) as gap,
-            sector,
-            prev_sector,
-            size_sectors
-        FROM ordered_reads
-        WHERE prev_sector IS NOT NULL
-    """)
-
-    # Categorize gaps
-    gap_stats = con.execute(f"""
-        SELECT
-            SUM(CASE WHEN gap = 0 THEN 1 ELSE 0 END) as perfect_sequential,
-            SUM(CASE WHEN gap > 0 AND gap < {gap_small} THEN 1 ELSE 0 END) as small_gap,
-            SUM(CASE WHEN gap >= {gap_small} AND gap < {gap_medium} THEN 1 ELSE 0 END) as medium_gap,
-            SUM(CASE WHEN gap >= {gap_medium} THEN 1 ELSE 0 END) as large_gap,
-            SUM(CASE WHEN gap < 0 THEN 1 ELSE 0 END) as backward,
-            COUNT(*) as total
-        FROM gaps
-    """).fetchone()
-
-    perfect = gap_stats[0] or 0
-    small = gap_stats[1] or 0
-    medium = gap_stats[2] or 0
-    large = gap_stats[3] or 0
-    backward = gap_stats[4] or 0
-    total_gaps = gap_stats[5] or 1
+    # Buckets were computed in the combined scan above
+    perfect = perfect or 0
+    small = small or 0
+    medium = medium or 0
+    large = large or 0
+    backward = backward or 0
+    total_gaps = total_gaps or 1
 
     log(f"\nGap Distribution:")
     log(f"  Perfect sequential (gap=0):     {perfect:6,} ({perfect/total_gaps*100:5.1f}%)")
@@ -361,7 +462,11 @@ def analyze_with_duckdb(csv_path, result_dir, gap_small, gap_medium, gguf_start_
 
     log("\nCalculating bandwidth over time...")
 
-    bandwidth = con.execute("""
+    # Aggregate avg/peak inside DuckDB instead of fetching every bucket
+    # and reducing in Python; only the first 10 buckets cross over for
+    # the log output.
+    con.execute("""
+        CREATE OR REPLACE TABLE bandwidth AS
         SELECT
             CAST(timestamp AS INTEGER) as time_bucket,
             COUNT(*) as operations,
@@ -369,26 +474,30 @@ def analyze_with_duckdb(csv_path, result_dir, gap_small, gap_medium, gguf_start_
         FROM reads
         GROUP BY time_bucket
         ORDER BY time_bucket
-    """).fetchall()
+    """)
 
-    if bandwidth:
+    avg_bandwidth, max_bandwidth = con.execute(
+        "SELECT COALESCE(AVG(mb_read), 0), COALESCE(MAX(mb_read), 0) FROM bandwidth"
+    ).fetchone()
+
+    first_buckets = con.execute(
+        "SELECT time_bucket, operations, mb_read FROM bandwidth ORDER BY time_bucket LIMIT 10"
+    ).fetchall()
+
+    if first_buckets:
         log(f"Bandwidth per second (first 10 seconds):")
-        for i, (bucket, ops, mb) in enumerate(bandwidth[:10]):
+        for bucket, ops, mb in first_buckets:
             log(f"  {bucket}s: {mb:8.2f} MB/s ({ops:5,} ops)")
 
-        avg_bandwidth = sum(row[2] for row in bandwidth) / len(bandwidth)
-        max_bandwidth = max(row[2] for row in bandwidth)
         log(f"\nAverage bandwidth: {avg_bandwidth:.2f} MB/s")
         log(f"Peak bandwidth:    {max_bandwidth:.2f} MB/s")
-    else:
-        avg_bandwidth = 0
-        max_bandwidth = 0
 
     # ========================================================================
     # Save analysis results
     # ========================================================================
 
     analysis = {
+        "inputs": inputs,
         "total_reads": int(total_rows),
         "total_bytes_read": int(total_bytes),
         "total_mb_read": float(total_mb),
@@ -416,9 +525,6 @@ def analyze_with_duckdb(csv_path, result_dir, gap_small, gap_medium, gguf_start_
         }
     }
 
-    with open(result_dir / "analysis.json", 'w') as f:
-        json.dump(analysis, f, indent=2)
-
-    log(f"\nAnalysis saved to: {result_dir / 'analysis.json'}")
+    write_json(analysis_file, analysis)
 
-    con.close()
+    log(f"\nAnalysis saved to: {analysis_file}")
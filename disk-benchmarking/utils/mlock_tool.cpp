@@ -20,7 +20,19 @@ int main(int argc, char** argv) {
    size_t len = atoi(argv[1]) * (1024ull*1024*1024);
    std::cout << mlockall(MCL_FUTURE) << std::endl;
 
-   void* p = malloc(len);
+   void* p = mmap(nullptr, len, PROT_READ | PROT_WRITE,
+                  MAP_PRIVATE | MAP_ANONYMOUS, -1, 0);
+   if (p == MAP_FAILED) {
+      std::cerr << "mmap failed" << std::endl;
+      return 1;
+   }
+
+   // Back the locked region with transparent hugepages. Tens of GB in
+   // 4KiB pages means millions of PTEs, which raises TLB pressure on
+   // the llama-cli process running alongside. Advisory only - falls
+   // back to base pages if THP is unavailable.
+   madvise(p, len, MADV_HUGEPAGE);
+
    memset(p, 0, len);
    std::cout << len << " " << p << std::endl;
 
@@ -9,33 +9,258 @@ Includes:
 - tmpfs management
 """
 
+import json
 import os
+import shutil
 import subprocess
+import threading
+import time
 from pathlib import Path
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 def log(msg):
     """Timestamped logging"""
     print(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}", flush=True)
 
 
+def write_json(path, obj):
+    """Write a JSON file (indented) atomically
+
+    Uses orjson when available (C encoder, bytes out) and falls back to
+    stdlib json. Writes to a tmpfile and renames so a crashed
+    experiment never leaves a half-written config/metrics file.
+
+    Args:
+        path: Output file path
+        obj: JSON-serializable object
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + '.tmp')
+
+    if orjson is not None:
+        tmp_path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        with open(tmp_path, 'w') as f:
+            json.dump(obj, f, indent=2)
+
+    tmp_path.replace(path)
+
+
 def run_cmd(cmd, check=True, capture=False):
-    """Run shell command
+    """Run a command
+
+    List commands exec directly (no /bin/sh fork, no re-quoting bugs);
+    string commands still go through the shell for pipelines and
+    redirections.
 
     Args:
-        cmd: Command string to execute
+        cmd: Command as argv list (preferred) or shell string
         check: Raise exception on non-zero exit (default: True)
         capture: Capture and return stdout (default: False)
 
     Returns:
         str: stdout if capture=True, None otherwise
     """
+    shell = isinstance(cmd, str)
+
     if capture:
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, check=check)
+        result = subprocess.run(cmd, shell=shell, capture_output=True, text=True, check=check)
         return result.stdout.strip()
     else:
-        subprocess.run(cmd, shell=True, check=check)
+        subprocess.run(cmd, shell=shell, check=check)
+
+
+def prefault_file(path, num_threads=4, chunk_bytes=1024 ** 3):
+    """Pre-warm a file into the page cache before inference starts
+
+    Issues posix_fadvise(WILLNEED) for the whole file, then fans out
+    readahead(2) calls over disjoint ranges from a few threads. With
+    mmap'd model loading this replaces a serial single-threaded copy of
+    the model with parallel page-cache warming.
+
+    Only use this for warm-cache runs - it defeats drop_caches().
+
+    Args:
+        path: File to prefault
+        num_threads: Parallel readahead threads (default: 4)
+        chunk_bytes: Range size per readahead call (default: 1 GiB)
+    """
+    import ctypes
+
+    size = os.stat(path).st_size
+    log(f"Prefaulting {path} ({size / (1024**3):.2f} GB, {num_threads} threads)...")
+
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, size, os.POSIX_FADV_WILLNEED)
+
+        try:
+            libc = ctypes.CDLL("libc.so.6", use_errno=True)
+            libc.readahead
+        except (OSError, AttributeError):
+            # No readahead(2) available; fadvise alone still queues the I/O
+            return
+
+        offsets = list(range(0, size, chunk_bytes))
+
+        def _readahead(worker_id):
+            for off in offsets[worker_id::num_threads]:
+                length = min(chunk_bytes, size - off)
+                libc.readahead(fd, ctypes.c_uint64(off), ctypes.c_size_t(length))
+
+        workers = [threading.Thread(target=_readahead, args=(i,)) for i in range(num_threads)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+    finally:
+        os.close(fd)
+
+    log("Prefault complete")
+
+
+def wait_for(condition, timeout, description, interval=0.05):
+    """Poll a readiness condition instead of sleeping a fixed time
+
+    Args:
+        condition: Callable returning truthy once ready
+        timeout: Max seconds to wait
+        description: What we're waiting for (used in timeout warning)
+        interval: Poll interval in seconds (default: 50ms)
+
+    Returns:
+        bool: True if condition became true, False on timeout
+    """
+    deadline = time.time() + timeout
+
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(interval)
+
+    log(f"WARNING: Timed out after {timeout}s waiting for {description}")
+    return False
+
+
+def copy_file(src, dst):
+    """Copy a file via in-kernel copy_file_range, no cp fork
+
+    On reflink-capable filesystems (btrfs/xfs) this is O(1); on ext4 it
+    still avoids the userspace read/write bounce. Falls back to
+    shutil.copyfile if copy_file_range is unsupported (e.g. copies
+    across filesystems on older kernels).
+
+    Args:
+        src: Source file path
+        dst: Destination file path
+    """
+    size = os.stat(src).st_size
+
+    try:
+        with open(src, 'rb') as s, open(dst, 'wb') as d:
+            remaining = size
+            while remaining > 0:
+                copied = os.copy_file_range(s.fileno(), d.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+class ThreadSampler(threading.Thread):
+    """Sample per-thread CPU and system memory via /proc in one loop
+
+    Reads /proc/<pid>/task/*/stat and /proc/meminfo directly instead of
+    running separate ps/free monitors. Rows are prefix-tagged so one
+    consumer can demux them:
+
+        CPU,<timestamp>,<tid>,<comm>,<utime_delta>,<stime_delta>
+        MEM,<timestamp>,<mem_free_kb>,<cached_kb>,<mem_available_kb>
+
+    Deltas are in clock ticks since the previous sample.
+
+    Usage:
+        sampler = ThreadSampler(pid, log_path, interval=2)
+        sampler.start()
+        ...
+        sampler.stop()
+    """
+
+    def __init__(self, pid, log_path, interval=2):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.log_path = Path(log_path)
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._prev = {}  # tid -> (utime, stime)
+
+    def _sample(self, log_file):
+        task_dir = f"/proc/{self.pid}/task"
+        now = time.time()
+
+        try:
+            tids = os.scandir(task_dir)
+        except OSError:
+            return False  # Process exited
+
+        for tid_entry in tids:
+            try:
+                with open(f"{task_dir}/{tid_entry.name}/stat") as f:
+                    stat = f.read()
+            except OSError:
+                continue  # Thread exited between scandir and open
+
+            # Fields after the "(comm)" - comm may contain spaces, so split
+            # on the closing paren. utime/stime are fields 14/15 (1-based),
+            # i.e. index 11/12 of the post-comm fields.
+            comm = stat[stat.index('(') + 1:stat.rindex(')')]
+            fields = stat[stat.rindex(')') + 2:].split()
+            utime = int(fields[11])
+            stime = int(fields[12])
+
+            prev_utime, prev_stime = self._prev.get(tid_entry.name, (utime, stime))
+            self._prev[tid_entry.name] = (utime, stime)
+
+            log_file.write(
+                f"CPU,{now:.3f},{tid_entry.name},{comm},"
+                f"{utime - prev_utime},{stime - prev_stime}\n"
+            )
+
+        # One system memory row per tick from /proc/meminfo
+        meminfo = {}
+        with open("/proc/meminfo") as f:
+            for line in f:
+                key, rest = line.split(':', 1)
+                meminfo[key] = int(rest.split()[0])  # kB
+
+        log_file.write(
+            f"MEM,{now:.3f},{meminfo.get('MemFree', 0)},"
+            f"{meminfo.get('Cached', 0)},{meminfo.get('MemAvailable', 0)}\n"
+        )
+
+        log_file.flush()
+        return True
+
+    def run(self):
+        with open(self.log_path, 'w') as log_file:
+            log_file.write("# CPU,timestamp,tid,comm,utime_delta,stime_delta\n")
+            log_file.write("# MEM,timestamp,mem_free_kb,cached_kb,mem_available_kb\n")
+            while not self._stop_event.is_set():
+                if not self._sample(log_file):
+                    break
+                self._stop_event.wait(self.interval)
+
+    def stop(self):
+        """Signal the sampler to stop and wait for it to finish"""
+        self._stop_event.set()
+        self.join(timeout=self.interval + 1)
 
 
 def check_root():
@@ -46,11 +271,32 @@ def check_root():
         sys.exit(1)
 
 
-def drop_caches():
-    """Clear page cache, dentries, and inodes"""
+def drop_caches(model_path=None):
+    """Clear the page cache (and evict a specific file if given)
+
+    Drops pagecache only (echo 1) rather than the global echo 3 purge:
+    dropping dentries/inodes is irrelevant to this workload and costs
+    seconds of VFS re-walks on subsequent runs. When model_path is
+    given, its pages are additionally evicted with
+    posix_fadvise(DONTNEED) so the file under test is guaranteed cold.
+
+    Args:
+        model_path: Optional file to evict explicitly
+    """
     log("Dropping caches...")
-    run_cmd("sync")
-    run_cmd('sh -c "echo 3 > /proc/sys/vm/drop_caches"')
+
+    if model_path is not None:
+        fd = os.open(model_path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+    # os.sync() + direct procfs write: same effect as the sync(1) and
+    # sh -c "echo 1 > ..." subprocesses, without two fork/execs
+    os.sync()
+    with open('/proc/sys/vm/drop_caches', 'w') as f:
+        f.write('1\n')
     log("Caches dropped")
 
 
@@ -71,10 +317,91 @@ def compile_mem_locker(mlock_bin, mlock_tool_cpp):
         sys.exit(1)
 
     log(f"Compiling mem_locker...")
-    run_cmd(f"g++ -o {mlock_bin} {mlock_tool_cpp} -pthread")
+    run_cmd(["g++", "-o", str(mlock_bin), str(mlock_tool_cpp), "-pthread"])
     log(f"Compiled: {mlock_bin}")
 
 
+def get_backing_device(path):
+    """Resolve the whole-disk block device backing a file or directory
+
+    Uses os.stat + /sys/dev/block instead of a df | awk pipeline, so no
+    forks and no regex to strip partition suffixes. Handles nvme/mmcblk
+    naming (nvme0n1p1 -> nvme0n1) via the sysfs parent link.
+
+    Args:
+        path: File or directory on the filesystem of interest
+
+    Returns:
+        str: Device path, e.g. /dev/nvme0n1
+    """
+    st = os.stat(path)
+    major, minor = os.major(st.st_dev), os.minor(st.st_dev)
+
+    sysdev = Path(f"/sys/dev/block/{major}:{minor}").resolve()
+
+    # Partitions have a 'partition' attribute; their sysfs parent is the disk
+    if (sysdev / "partition").exists():
+        sysdev = sysdev.parent
+
+    return f"/dev/{sysdev.name}"
+
+
+def create_swap_file(swap_file, size_gb):
+    """Create and enable a swap file, preallocating with fallocate
+
+    fallocate reserves the extents in milliseconds without pushing
+    size_gb of zeroes through the page cache the way dd does. Falls
+    back to dd with direct I/O on filesystems without fallocate
+    support.
+
+    Args:
+        swap_file: Path for the swap file
+        size_gb: Swap size in GB
+
+    Returns:
+        Path: swap file path
+    """
+    swap_path = Path(swap_file)
+
+    if swap_path.exists():
+        log(f"Swap file exists: {swap_path}")
+        return swap_path
+
+    log(f"Creating {size_gb}GB swap file at {swap_path}...")
+
+    result = run_cmd(["fallocate", "-l", f"{size_gb}G", str(swap_path)], check=False, capture=True)
+    if not swap_path.exists() or swap_path.stat().st_size == 0:
+        # fallocate unsupported on this FS - write zeroes, but bypass
+        # the page cache so we don't evict the model under test
+        log("fallocate not supported, falling back to dd (direct I/O)...")
+        run_cmd(["dd", "if=/dev/zero", f"of={swap_path}", "bs=1M",
+                 f"count={size_gb * 1024}", "status=none", "oflag=direct"])
+
+    run_cmd(["chmod", "600", str(swap_path)])
+    run_cmd(["mkswap", str(swap_path)])
+    run_cmd(["swapon", str(swap_path)])
+
+    log(f"Swap file active: {swap_path} ({size_gb}GB)")
+    return swap_path
+
+
+def remove_swap_file(swap_file):
+    """Disable and delete a swap file
+
+    Args:
+        swap_file: Path to the swap file
+    """
+    swap_path = Path(swap_file)
+
+    log(f"Removing swap file {swap_path}...")
+    run_cmd(["swapoff", str(swap_path)], check=False)
+
+    if swap_path.exists():
+        swap_path.unlink()
+
+    log("Swap file removed")
+
+
 def mount_dedicated_tmpfs(tmpfs_mount, tmpfs_size_gb):
     """Mount dedicated tmpfs for blktrace (isolated from page cache)
 
@@ -87,9 +414,12 @@ def mount_dedicated_tmpfs(tmpfs_mount, tmpfs_size_gb):
     """
     mount_path = Path(tmpfs_mount)
 
-    # Check if already mounted
-    result = run_cmd(f"mount | grep {tmpfs_mount}", check=False, capture=True)
-    if result:
+    # Check if already mounted - exact mountpoint match from
+    # /proc/self/mounts, no shell pipeline and no substring
+    # false-positives from grep
+    with open('/proc/self/mounts') as f:
+        mounted = any(line.split()[1] == str(tmpfs_mount) for line in f)
+    if mounted:
         log(f"tmpfs already mounted at {tmpfs_mount}")
         return mount_path
 
@@ -98,11 +428,12 @@ def mount_dedicated_tmpfs(tmpfs_mount, tmpfs_size_gb):
 
     # Mount tmpfs with fixed size
     log(f"Mounting dedicated tmpfs ({tmpfs_size_gb}GB) at {tmpfs_mount}...")
-    run_cmd(f"mount -t tmpfs -o size={tmpfs_size_gb}G tmpfs {tmpfs_mount}")
+    run_cmd(["mount", "-t", "tmpfs", "-o", f"size={tmpfs_size_gb}G", "tmpfs", str(tmpfs_mount)])
 
-    # Verify
-    result = run_cmd(f"df -h {tmpfs_mount}", capture=True)
-    log(f"tmpfs mounted successfully:\n{result}")
+    # Verify size via statvfs instead of forking df
+    vfs = os.statvfs(tmpfs_mount)
+    size_gb = vfs.f_blocks * vfs.f_frsize / 1024**3
+    log(f"tmpfs mounted successfully: {size_gb:.1f} GB at {tmpfs_mount}")
 
     return mount_path
 
@@ -116,7 +447,7 @@ def unmount_dedicated_tmpfs(tmpfs_mount):
     log(f"Unmounting dedicated tmpfs at {tmpfs_mount}...")
 
     # Unmount
-    run_cmd(f"umount {tmpfs_mount}", check=False)
+    run_cmd(["umount", str(tmpfs_mount)], check=False)
 
     # Remove directory
     mount_path = Path(tmpfs_mount)
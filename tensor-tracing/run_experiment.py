@@ -15,19 +15,76 @@ Configuration:
     Edit settings.json to configure experiment parameters
 """
 
+import collections
+import contextlib
+import io
 import os
 import sys
 import json
 import subprocess
 import shutil
+import traceback
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
+# Parser tools are imported in-process instead of spawned as python3
+# subprocesses - one interpreter startup and one set of imports total.
+# Aliased because this module has functions of the same names.
+sys.path.insert(0, str(Path(__file__).parent / 'tools'))
+import parse_csv as parse_csv_tool
+import parse_dot as parse_dot_tool
+import parse_trace as parse_trace_tool
+import parse_buffer_stats as parse_buffer_stats_tool
+
+
+# redirect_stdout swaps the process-global sys.stdout, so two tools
+# capturing concurrently would steal each other's output (or leave
+# sys.stdout pointing at a dead buffer). Serialize the capture.
+#
+# IMPORTANT: never call _run_tool from ProcessPoolExecutor workers. On
+# Linux the pool forks, and a worker forked while a sibling thread
+# holds this lock inherits it permanently locked — acquiring it in the
+# child deadlocks. Workers own their stdout anyway; call the tool
+# function directly (see _run_parse_dot).
+_RUN_TOOL_LOCK = threading.Lock()
+
+
+def _run_tool(tool_main, argv):
+    """Call a parser tool's main() in-process, capturing its stdout.
+
+    Mirrors the old (returncode, output) subprocess interface without
+    the interpreter spawn. Holds _RUN_TOOL_LOCK for the duration of
+    the call, so in-process tool bodies never run concurrently.
+
+    Args:
+        tool_main: The tool module's main function
+        argv: Argument list for the tool
+
+    Returns:
+        Tuple of (returncode, captured output)
+    """
+    buf = io.StringIO()
+    try:
+        with _RUN_TOOL_LOCK, contextlib.redirect_stdout(buf):
+            rc = tool_main(argv)
+    except SystemExit as e:  # argparse usage errors
+        rc = e.code
+    except Exception:
+        return 1, buf.getvalue() + traceback.format_exc()
+    return (rc or 0), buf.getvalue()
+
+
+# Parse stages log from worker threads; serialize the lines
+_LOG_LOCK = threading.Lock()
+
 
 def log(message):
     """Print log message with timestamp."""
     timestamp = datetime.now().strftime("%H:%M:%S")
-    print(f"[{timestamp}] {message}")
+    with _LOG_LOCK:
+        print(f"[{timestamp}] {message}")
 
 
 def error_exit(message):
@@ -138,24 +195,24 @@ def verify_prerequisites(paths):
     """
     log("Verifying prerequisites...")
 
-    # Check llama-completion binary
-    if not paths['llama_binary'].exists():
-        error_exit(f"llama-completion not found: {paths['llama_binary']}")
-
-    # Check gguf-dump binary
-    if not paths['gguf_dump_binary'].exists():
-        error_exit(f"llama-gguf-dump not found: {paths['gguf_dump_binary']}")
-
-    # Check model file
-    if not paths['model_file'].exists():
-        error_exit(f"Model file not found: {paths['model_file']}")
+    # One table drives all checks; os.stat is a single syscall per
+    # entry without the Path.exists() wrapper
+    required = [
+        ('llama-completion', paths['llama_binary']),
+        ('llama-gguf-dump', paths['gguf_dump_binary']),
+        ('Model file', paths['model_file']),
+    ]
+    required += [
+        ('Parser script', paths['tools_dir'] / script)
+        for script in ('parse_trace.py', 'parse_dot.py',
+                       'parse_buffer_stats.py', 'parse_csv.py')
+    ]
 
-    # Check parser scripts
-    required_scripts = ['parse_trace.py', 'parse_dot.py', 'parse_buffer_stats.py', 'parse_csv.py']
-    for script in required_scripts:
-        script_path = paths['tools_dir'] / script
-        if not script_path.exists():
-            error_exit(f"Parser script not found: {script_path}")
+    for name, path in required:
+        try:
+            os.stat(path)
+        except FileNotFoundError:
+            error_exit(f"{name} not found: {path}")
 
     log("✓ All prerequisites verified")
 
@@ -196,7 +253,7 @@ def run_llama_inference(paths, settings):
         settings: Settings dictionary
 
     Returns:
-        Inference time in seconds
+        Tuple of (inference time in seconds, number of graph files)
     """
     log("Running llama-completion with tensor tracing...")
 
@@ -213,20 +270,36 @@ def run_llama_inference(paths, settings):
     log(f"  Prompt: \"{settings['experiment']['prompt']}\"")
     log(f"  Tokens: {settings['experiment']['tokens_to_generate']}")
 
-    # Run inference
+    # Run inference, streaming output to a log file as it arrives.
+    # capture_output=True would buffer the whole generation in memory;
+    # streaming keeps RSS flat for long runs while a bounded tail is
+    # kept for the error message.
+    log_path = paths['script_dir'] / 'llama-completion.log'
+    tail = collections.deque(maxlen=200)
+
     import time
     start_time = time.time()
 
-    result = subprocess.run(
-        cmd,
-        capture_output=True,
-        text=True
-    )
+    with open(log_path, 'w') as log_fh:
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=1,
+            text=True
+        )
+        for line in proc.stdout:
+            log_fh.write(line)
+            tail.append(line)
+        returncode = proc.wait()
 
     elapsed_time = time.time() - start_time
 
-    if result.returncode != 0:
-        error_exit(f"llama-completion failed:\n{result.stderr}")
+    if returncode != 0:
+        error_exit(
+            f"llama-completion failed (full log: {log_path}):\n"
+            + ''.join(tail)
+        )
 
     log(f"✓ Inference complete ({elapsed_time:.2f}s)")
 
@@ -237,17 +310,18 @@ def run_llama_inference(paths, settings):
     if not paths['buffer_stats'].exists():
         error_exit(f"Buffer stats not generated: {paths['buffer_stats']}")
 
-    if not paths['graphs_dir'].exists() or not list(paths['graphs_dir'].glob('*.dot')):
+    # One directory scan serves both the existence check and the count
+    dot_files = list(paths['graphs_dir'].glob('*.dot')) if paths['graphs_dir'].exists() else []
+    if not dot_files:
         error_exit(f"Graph files not generated in: {paths['graphs_dir']}")
 
-    # Count generated files
-    num_graphs = len(list(paths['graphs_dir'].glob('*.dot')))
+    num_graphs = len(dot_files)
     trace_size_mb = paths['trace_bin'].stat().st_size / (1024 * 1024)
 
     log(f"  Trace file: {trace_size_mb:.2f} MB")
     log(f"  Graph files: {num_graphs}")
 
-    return elapsed_time
+    return elapsed_time, num_graphs
 
 
 def parse_gguf_to_memory_map(paths):
@@ -259,6 +333,25 @@ def parse_gguf_to_memory_map(paths):
     """
     log("Parsing GGUF model...")
 
+    output_path = paths['webui_data_dir'] / 'memory-map.json'
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # The model rarely changes between experiments, so the dump+parse
+    # is cached keyed on the model file's identity (path, size, mtime);
+    # any mismatch falls through and overwrites the cache
+    model_stat = paths['model_file'].stat()
+    cache_key = [str(paths['model_file']), model_stat.st_size, int(model_stat.st_mtime)]
+    cache_dir = paths['script_dir'] / '.cache'
+    cache_meta = cache_dir / 'memory_map.meta.json'
+    cache_json = cache_dir / 'memory-map.json'
+
+    if cache_meta.exists() and cache_json.exists():
+        with open(cache_meta, 'r') as f:
+            if json.load(f) == cache_key:
+                shutil.copy(cache_json, output_path)
+                log(f"✓ Memory map reused from cache (model unchanged): {output_path}")
+                return
+
     # Step 1: Generate CSV using llama-gguf-dump
     csv_path = paths['script_dir'] / 'temp_model_structure.csv'
 
@@ -278,29 +371,24 @@ def parse_gguf_to_memory_map(paths):
     log(f"  CSV generated: {csv_path}")
 
     # Step 2: Parse CSV to JSON
-    output_path = paths['webui_data_dir'] / 'memory-map.json'
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-
-    parse_csv_script = paths['tools_dir'] / 'parse_csv.py'
-
-    result = subprocess.run(
-        [
-            'python3',
-            str(parse_csv_script),
-            '--csv', str(csv_path),
-            # NOTE: --gguf-file removed - gguf-dump now outputs absolute offsets
-            '--output', str(output_path)
-        ],
-        capture_output=True,
-        text=True
-    )
+    # NOTE: --gguf-file removed - gguf-dump now outputs absolute offsets
+    returncode, output = _run_tool(parse_csv_tool.main, [
+        '--csv', str(csv_path),
+        '--output', str(output_path)
+    ])
 
-    if result.returncode != 0:
-        error_exit(f"parse_csv.py failed:\n{result.stderr}")
+    if returncode != 0:
+        error_exit(f"parse_csv.py failed:\n{output}")
 
     # Clean up temp CSV
     csv_path.unlink()
 
+    # Refresh the cache for the next run
+    cache_dir.mkdir(exist_ok=True)
+    shutil.copy(output_path, cache_json)
+    with open(cache_meta, 'w') as f:
+        json.dump(cache_key, f)
+
     log(f"✓ Memory map generated: {output_path}")
 
 
@@ -310,37 +398,61 @@ def parse_trace_to_json(paths):
 
     Args:
         paths: Dictionary of paths
+
+    Returns:
+        Number of trace JSON files generated
     """
     log("Parsing tensor trace...")
 
     output_dir = paths['webui_data_dir'] / 'traces'
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    # Clear existing trace JSONs
-    for old_file in output_dir.glob('token-*.json'):
-        old_file.unlink()
+    # Clear existing trace JSONs; scandir streams dentries without the
+    # per-entry stat that Path.glob pays
+    with os.scandir(output_dir) as it:
+        for entry in it:
+            if entry.name.startswith('token-') and entry.name.endswith('.json'):
+                os.unlink(entry.path)
 
-    parse_trace_script = paths['tools_dir'] / 'parse_trace.py'
-
-    result = subprocess.run(
-        [
-            'python3',
-            str(parse_trace_script),
-            str(paths['trace_bin']),
-            '--export-json', str(output_dir)
-        ],
-        capture_output=True,
-        text=True
-    )
+    returncode, output = _run_tool(parse_trace_tool.main, [
+        str(paths['trace_bin']),
+        '--export-json', str(output_dir)
+    ])
 
-    if result.returncode != 0:
-        error_exit(f"parse_trace.py failed:\n{result.stderr}")
+    if returncode != 0:
+        error_exit(f"parse_trace.py failed:\n{output}")
 
     # Print output (shows per-token stats)
-    print(result.stdout)
+    print(output)
 
     num_files = len(list(output_dir.glob('token-*.json')))
     log(f"✓ Generated {num_files} trace JSON files")
+    return num_files
+
+
+def _run_parse_dot(task):
+    """Parse one DOT file in a worker process.
+
+    Module-level so ProcessPoolExecutor can pickle it. Calls
+    convert_file directly instead of going through _run_tool: a forked
+    worker can inherit _RUN_TOOL_LOCK in the locked state and would
+    deadlock acquiring it, and workers have their own stdout so there
+    is nothing to serialize.
+
+    Args:
+        task: Tuple of (dot_file, output_file) strings
+
+    Returns:
+        Tuple of (dot_file, returncode, error output)
+    """
+    dot_file, output_file = task
+
+    try:
+        parse_dot_tool.convert_file(dot_file, output_file, verbose=False)
+    except Exception:
+        return (dot_file, 1, traceback.format_exc())
+
+    return (dot_file, 0, '')
 
 
 def parse_graphs_to_json(paths):
@@ -349,17 +461,20 @@ def parse_graphs_to_json(paths):
 
     Args:
         paths: Dictionary of paths
+
+    Returns:
+        Number of graph JSON files generated
     """
     log("Parsing computation graphs...")
 
     output_dir = paths['webui_data_dir'] / 'graphs'
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    # Clear existing graph JSONs
-    for old_file in output_dir.glob('token-*.json'):
-        old_file.unlink()
-
-    parse_dot_script = paths['tools_dir'] / 'parse_dot.py'
+    # Clear existing graph JSONs (scandir: see parse_trace_to_json)
+    with os.scandir(output_dir) as it:
+        for entry in it:
+            if entry.name.startswith('token-') and entry.name.endswith('.json'):
+                os.unlink(entry.path)
 
     # Process each DOT file
     dot_files = sorted(paths['graphs_dir'].glob('token_*.dot'))
@@ -367,27 +482,24 @@ def parse_graphs_to_json(paths):
     if not dot_files:
         error_exit(f"No DOT files found in {paths['graphs_dir']}")
 
+    # One file per token and no shared state - embarrassingly parallel,
+    # so fan the parses out across all cores instead of paying each
+    # one's cost serially
+    tasks = []
     for dot_file in dot_files:
         # Extract token ID from filename (e.g., token_00001.dot -> 1)
         token_id_str = dot_file.stem.split('_')[1]  # "00001"
         output_file = output_dir / f"token-{token_id_str}.json"
+        tasks.append((str(dot_file), str(output_file)))
 
-        result = subprocess.run(
-            [
-                'python3',
-                str(parse_dot_script),
-                '--dot', str(dot_file),
-                '--output', str(output_file)
-            ],
-            capture_output=True,
-            text=True
-        )
-
-        if result.returncode != 0:
-            error_exit(f"parse_dot.py failed for {dot_file}:\n{result.stderr}")
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for dot_file, returncode, stderr in executor.map(_run_parse_dot, tasks):
+            if returncode != 0:
+                error_exit(f"parse_dot.py failed for {dot_file}:\n{stderr}")
 
     num_files = len(list(output_dir.glob('token-*.json')))
     log(f"✓ Generated {num_files} graph JSON files")
+    return num_files
 
 
 def parse_buffer_stats(paths):
@@ -402,43 +514,35 @@ def parse_buffer_stats(paths):
     output_file = paths['webui_data_dir'] / 'buffer-timeline.json'
     output_file.parent.mkdir(parents=True, exist_ok=True)
 
-    parse_buffer_script = paths['tools_dir'] / 'parse_buffer_stats.py'
+    returncode, output = _run_tool(parse_buffer_stats_tool.main, [
+        str(paths['buffer_stats']),
+        '--output', str(output_file)
+    ])
 
-    result = subprocess.run(
-        [
-            'python3',
-            str(parse_buffer_script),
-            str(paths['buffer_stats']),
-            '--output', str(output_file)
-        ],
-        capture_output=True,
-        text=True
-    )
-
-    if result.returncode != 0:
-        error_exit(f"parse_buffer_stats.py failed:\n{result.stderr}")
+    if returncode != 0:
+        error_exit(f"parse_buffer_stats.py failed:\n{output}")
 
     log(f"✓ Buffer timeline generated: {output_file}")
 
 
-def display_summary(paths, inference_time):
+def display_summary(paths, inference_time, num_trace_files, num_graph_files):
     """
     Display experiment summary.
 
     Args:
         paths: Dictionary of paths
         inference_time: Inference time in seconds
+        num_trace_files: Number of trace JSON files generated
+        num_graph_files: Number of graph JSON files generated
     """
     log("\n" + "=" * 70)
     log("EXPERIMENT COMPLETE!")
     log("=" * 70)
 
-    # Count generated files
+    # Counts come from the parse stages themselves; no need to re-walk
+    # the output directories here
     data_dir = paths['webui_data_dir']
 
-    num_trace_files = len(list((data_dir / 'traces').glob('token-*.json')))
-    num_graph_files = len(list((data_dir / 'graphs').glob('token-*.json')))
-
     log(f"\nGenerated data:")
     log(f"  Memory map:      {data_dir / 'memory-map.json'}")
     log(f"  Buffer timeline: {data_dir / 'buffer-timeline.json'}")
@@ -473,22 +577,28 @@ def main():
     clean_temp_files(paths)
 
     # Step 2: Run inference
-    inference_time = run_llama_inference(paths, settings)
-
-    # Step 3: Parse GGUF to memory map
-    parse_gguf_to_memory_map(paths)
-
-    # Step 4: Parse trace to JSON per token
-    parse_trace_to_json(paths)
-
-    # Step 5: Parse graphs to JSON per token
-    parse_graphs_to_json(paths)
+    inference_time, _num_dot_files = run_llama_inference(paths, settings)
+
+    # Steps 3-6: the four parse stages read and write disjoint files,
+    # so run them concurrently - wall clock becomes max(stages) rather
+    # than sum(stages). Threads suffice: the heavy stages spend their
+    # time in child processes (gguf-dump, the DOT worker pool) or file
+    # I/O rather than holding the GIL.
+    parse_stages = [
+        parse_gguf_to_memory_map,   # Step 3: GGUF to memory map
+        parse_trace_to_json,        # Step 4: trace to JSON per token
+        parse_graphs_to_json,       # Step 5: graphs to JSON per token
+        parse_buffer_stats,         # Step 6: buffer stats
+    ]
+    with ThreadPoolExecutor(max_workers=len(parse_stages)) as executor:
+        futures = [executor.submit(stage, paths) for stage in parse_stages]
+        results = [future.result() for future in futures]
 
-    # Step 6: Parse buffer stats
-    parse_buffer_stats(paths)
+    num_trace_files = results[parse_stages.index(parse_trace_to_json)]
+    num_graph_files = results[parse_stages.index(parse_graphs_to_json)]
 
     # Display summary
-    display_summary(paths, inference_time)
+    display_summary(paths, inference_time, num_trace_files, num_graph_files)
 
 
 if __name__ == '__main__':
@@ -22,10 +22,19 @@ Usage:
 
 import argparse
 import json
+import mmap
+import os
 import sys
 from pathlib import Path
 from typing import List, Dict, Any
 
+# orjson parses/serializes several times faster than stdlib json; fall
+# back silently when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 # Buffer usage type names
 BUFFER_USAGE_NAMES = {
@@ -35,94 +44,113 @@ BUFFER_USAGE_NAMES = {
 }
 
 
-def parse_jsonl(jsonl_path: Path) -> List[Dict[str, Any]]:
+def iter_events(jsonl_path: Path):
     """
-    Parse JSONL file and return list of events.
+    Yield events from a JSONL file one at a time.
+
+    Generator rather than list: the downstream processing is a single
+    pass, so the raw event dicts never need to be held in memory all
+    at once.
 
     Args:
         jsonl_path: Path to JSONL file
 
-    Returns:
-        List of event dictionaries
+    Yields:
+        Event dictionaries
     """
-    events = []
-
-    with open(jsonl_path, 'r') as f:
-        for line_num, line in enumerate(f, 1):
-            line = line.strip()
-            if not line:
+    loads = orjson.loads if orjson is not None else json.loads
+
+    # mmap: line boundaries are found in C over pages served straight
+    # from the page cache, instead of per-line reads through the
+    # buffered-IO layer. orjson accepts bytes directly, so lines also
+    # skip a decode round trip.
+    with open(jsonl_path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file cannot be mapped
+            return
+
+        for line_num, line in enumerate(iter(mm.readline, b''), 1):
+            if not line or line.isspace():
                 continue
 
             try:
-                event = json.loads(line)
-                events.append(event)
-            except json.JSONDecodeError as e:
+                event = loads(line)
+            except ValueError as e:
                 print(f"Warning: Failed to parse line {line_num}: {e}", file=sys.stderr)
                 continue
 
-    return events
+            # Normalize optional fields once here so the processing
+            # loop can use plain indexing instead of .get() per event
+            event.setdefault('size', 0)
+            event.setdefault('name', 'unnamed')
+            event.setdefault('backend', 'unknown')
+            event.setdefault('usage', 0)
+            event.setdefault('layer', 65535)
+            yield event
 
 
-def build_buffer_registry(events: List[Dict]) -> Dict[int, Dict]:
+def process_events(events):
     """
-    Build registry of all buffers from allocation events.
-
-    Args:
-        events: List of events
+    Build the buffer registry and occupancy timeline in one pass.
 
-    Returns:
-        Dictionary mapping buffer_id -> buffer_info
-    """
-    registry = {}
-
-    for event in events:
-        if event.get('event') == 'alloc':
-            buffer_id = event['buffer_id']
-            registry[buffer_id] = {
-                'id': buffer_id,
-                'name': event.get('name', 'unnamed'),
-                'size': event.get('size', 0),
-                'backend': event.get('backend', 'unknown'),
-                'usage': event.get('usage', 0),
-                'usage_name': BUFFER_USAGE_NAMES.get(event.get('usage', 0), 'UNKNOWN'),
-                'layer': event.get('layer', 65535),
-                'alloc_time_ms': event['timestamp_ms'],
-                'dealloc_time_ms': None  # Will be filled in later
-            }
-
-    return registry
-
-
-def compute_occupancy_timeline(events: List[Dict], registry: Dict[int, Dict]) -> List[Dict]:
-    """
-    Compute buffer occupancy over time.
+    Registry, timeline and running peak used to be three separate
+    sweeps over the event list; each event updates all of them here.
+    Accepts any iterable (including the iter_events generator) and
+    counts events itself, so the raw events are never materialized.
 
     Args:
-        events: List of events
-        registry: Buffer registry
+        events: Iterable of events
 
     Returns:
-        Timeline with cumulative occupancy
+        Tuple of (registry, timeline, peak_occupancy_bytes, total_events)
     """
+    registry = {}
     timeline = []
     active_buffers = {}  # buffer_id -> size
     cumulative_size = 0
+    peak_occupancy = 0
+    total_events = 0
+
+    # Bound methods as locals: skips an attribute lookup per call in
+    # the per-event loop. Events arrive normalized from iter_events, so
+    # plain indexing replaces .get() with defaults.
+    timeline_append = timeline.append
+    active_pop = active_buffers.pop
 
     for event in events:
+        total_events += 1
         timestamp_ms = event['timestamp_ms']
         buffer_id = event['buffer_id']
-        event_type = event.get('event')
+        event_type = event['event']
 
         if event_type == 'alloc':
-            size = event.get('size', 0)
+            size = event['size']
+            name = event['name']
+            usage = event['usage']
+
+            registry[buffer_id] = {
+                'id': buffer_id,
+                'name': name,
+                'size': size,
+                'backend': event['backend'],
+                'usage': usage,
+                'usage_name': BUFFER_USAGE_NAMES.get(usage, 'UNKNOWN'),
+                'layer': event['layer'],
+                'alloc_time_ms': timestamp_ms,
+                'dealloc_time_ms': None  # Filled in on dealloc
+            }
+
             active_buffers[buffer_id] = size
             cumulative_size += size
+            if cumulative_size > peak_occupancy:
+                peak_occupancy = cumulative_size
 
-            timeline.append({
+            timeline_append({
                 'timestamp_ms': timestamp_ms,
                 'event': 'alloc',
                 'buffer_id': buffer_id,
-                'buffer_name': event.get('name', 'unnamed'),
+                'buffer_name': name,
                 'size': size,
                 'cumulative_size': cumulative_size,
                 'num_active_buffers': len(active_buffers)
@@ -130,14 +158,14 @@ def compute_occupancy_timeline(events: List[Dict], registry: Dict[int, Dict]) ->
 
         elif event_type == 'dealloc':
             if buffer_id in active_buffers:
-                size = active_buffers.pop(buffer_id)
+                size = active_pop(buffer_id)
                 cumulative_size -= size
 
                 # Update registry with dealloc time
                 if buffer_id in registry:
                     registry[buffer_id]['dealloc_time_ms'] = timestamp_ms
 
-                timeline.append({
+                timeline_append({
                     'timestamp_ms': timestamp_ms,
                     'event': 'dealloc',
                     'buffer_id': buffer_id,
@@ -149,17 +177,19 @@ def compute_occupancy_timeline(events: List[Dict], registry: Dict[int, Dict]) ->
             else:
                 print(f"Warning: Dealloc for unknown buffer {buffer_id}", file=sys.stderr)
 
-    return timeline
+    return registry, timeline, peak_occupancy, total_events
 
 
-def compute_metadata(events: List[Dict], registry: Dict, timeline: List[Dict]) -> Dict[str, Any]:
+def compute_metadata(total_events: int, registry: Dict, timeline: List[Dict],
+                     peak_occupancy: int) -> Dict[str, Any]:
     """
     Compute metadata about buffer usage.
 
     Args:
-        events: List of events
+        total_events: Number of events processed
         registry: Buffer registry
         timeline: Occupancy timeline
+        peak_occupancy: Peak occupancy in bytes (from process_events)
 
     Returns:
         Metadata dictionary
@@ -173,9 +203,6 @@ def compute_metadata(events: List[Dict], registry: Dict, timeline: List[Dict]) -
             'duration_ms': 0
         }
 
-    # Peak occupancy
-    peak_occupancy = max((t['cumulative_size'] for t in timeline), default=0)
-
     # Duration
     first_ts = timeline[0]['timestamp_ms']
     last_ts = timeline[-1]['timestamp_ms']
@@ -188,7 +215,7 @@ def compute_metadata(events: List[Dict], registry: Dict, timeline: List[Dict]) -
         usage_counts[usage_name] = usage_counts.get(usage_name, 0) + 1
 
     return {
-        'total_events': len(events),
+        'total_events': total_events,
         'total_buffers': len(registry),
         'peak_occupancy_bytes': peak_occupancy,
         'peak_occupancy_mb': round(peak_occupancy / (1024 * 1024), 2),
@@ -197,34 +224,35 @@ def compute_metadata(events: List[Dict], registry: Dict, timeline: List[Dict]) -
     }
 
 
+# (threshold, divisor, precision, suffix), largest first
+_SIZE_UNITS = (
+    (1 << 30, 1 << 30, 2, 'GB'),
+    (1 << 20, 1 << 20, 1, 'MB'),
+    (1 << 10, 1 << 10, 1, 'KB'),
+)
+
+
 def format_size(size_bytes: int) -> str:
     """Format size in human-readable format."""
-    if size_bytes < 1024:
-        return f"{size_bytes}B"
-    elif size_bytes < 1024 * 1024:
-        return f"{size_bytes / 1024:.1f}KB"
-    elif size_bytes < 1024 * 1024 * 1024:
-        return f"{size_bytes / (1024 * 1024):.1f}MB"
-    else:
-        return f"{size_bytes / (1024 * 1024 * 1024):.2f}GB"
+    for threshold, divisor, precision, suffix in _SIZE_UNITS:
+        if size_bytes >= threshold:
+            return f"{size_bytes / divisor:.{precision}f}{suffix}"
+    return f"{size_bytes}B"
 
 
-def generate_output(events: List[Dict], output_path: Path = None) -> None:
+def generate_output(processed, output_path: Path = None, pretty: bool = False) -> None:
     """
-    Generate output JSON from events.
+    Generate output JSON from processed events.
 
     Args:
-        events: List of events from JSONL
+        processed: Tuple from process_events
         output_path: Output file path (None for stdout)
+        pretty: Indent the JSON output (default: compact)
     """
-    # Build buffer registry
-    registry = build_buffer_registry(events)
-
-    # Compute occupancy timeline
-    timeline = compute_occupancy_timeline(events, registry)
+    registry, timeline, peak_occupancy, total_events = processed
 
     # Compute metadata
-    metadata = compute_metadata(events, registry, timeline)
+    metadata = compute_metadata(total_events, registry, timeline, peak_occupancy)
 
     # Convert registry to list
     buffers = sorted(registry.values(), key=lambda b: b['alloc_time_ms'])
@@ -236,6 +264,13 @@ def generate_output(events: List[Dict], output_path: Path = None) -> None:
         'timeline': timeline
     }
 
+    # Compact by default: the WebUI is the consumer and indentation
+    # roughly doubles both encode time and file size
+    if orjson is not None:
+        encoded = orjson.dumps(output, option=orjson.OPT_INDENT_2 if pretty else 0)
+    else:
+        encoded = json.dumps(output, indent=2 if pretty else None).encode()
+
     # Write output
     if output_path:
         output_dir = output_path.parent
@@ -243,28 +278,29 @@ def generate_output(events: List[Dict], output_path: Path = None) -> None:
             output_dir.mkdir(parents=True)
             print(f"Created directory: {output_dir}")
 
-        with open(output_path, 'w') as f:
-            json.dump(output, f, indent=2)
+        # Write via a temp file + rename so the WebUI can never observe
+        # a truncated timeline if this process dies mid-write
+        tmp_path = output_path.with_suffix('.tmp')
+        tmp_path.write_bytes(encoded)
+        os.replace(tmp_path, output_path)
 
-        file_size = output_path.stat().st_size
         print(f"✓ Buffer timeline written to: {output_path}")
-        print(f"  File size: {file_size / 1024:.1f} KB")
+        print(f"  File size: {len(encoded) / 1024:.1f} KB")
     else:
         # Output to stdout
-        json.dump(output, sys.stdout, indent=2)
+        sys.stdout.buffer.write(encoded)
         print()  # Newline after JSON
 
 
-def display_summary(events: List[Dict]) -> None:
+def display_summary(processed) -> None:
     """
     Display summary statistics to console.
 
     Args:
-        events: List of events
+        processed: Tuple from process_events
     """
-    registry = build_buffer_registry(events)
-    timeline = compute_occupancy_timeline(events, registry)
-    metadata = compute_metadata(events, registry, timeline)
+    registry, timeline, peak_occupancy, total_events = processed
+    metadata = compute_metadata(total_events, registry, timeline, peak_occupancy)
 
     print("\n=== Buffer Statistics ===\n")
     print(f"Total events:       {metadata['total_events']}")
@@ -288,7 +324,7 @@ def display_summary(events: List[Dict]) -> None:
         print(f"  ... and {len(registry) - 10} more")
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(
         description='Parse buffer stats JSONL to timeline JSON'
     )
@@ -309,29 +345,34 @@ def main():
         action='store_true',
         help='Display summary statistics'
     )
+    parser.add_argument(
+        '--pretty',
+        action='store_true',
+        help='Indent JSON output (default: compact)'
+    )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Check input file exists
     if not args.jsonl_file.exists():
         print(f"Error: File not found: {args.jsonl_file}", file=sys.stderr)
         return 1
 
-    # Parse JSONL
+    # Parse and process in one streamed pass; summary and output share
+    # the result
     print(f"Reading: {args.jsonl_file}")
-    events = parse_jsonl(args.jsonl_file)
+    processed = process_events(iter_events(args.jsonl_file))
 
-    if not events:
+    if processed[3] == 0:
         print("No events found in file", file=sys.stderr)
         return 1
 
-    print(f"✓ Parsed {len(events)} events")
+    print(f"✓ Parsed {processed[3]} events")
 
-    # Display summary or generate output
     if args.summary:
-        display_summary(events)
-    else:
-        generate_output(events, args.output)
+        display_summary(processed)
+    if args.output or not args.summary:
+        generate_output(processed, args.output, pretty=args.pretty)
 
     return 0
 
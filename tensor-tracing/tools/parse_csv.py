@@ -213,7 +213,7 @@ def parse_csv_to_memory_map(csv_path: str, model_name: str = None) -> Dict[str,
     return memory_map
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(
         description='Parse model structure CSV to generate memory-map.json with corrected absolute offsets'
     )
@@ -242,7 +242,7 @@ def main():
         help='Pretty-print JSON output'
     )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Parse CSV (offsets are already absolute from fixed gguf-dump)
     print(f"Reading CSV: {args.csv}")
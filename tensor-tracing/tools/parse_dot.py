@@ -7,14 +7,24 @@ format suitable for the WebUI visualization tool.
 
 Usage:
     python parse_dot.py --dot /tmp/graphs/token_00001.dot --output data/graphs/token-00001.json
+    python parse_dot.py --batch /tmp/graphs --output-dir data/graphs
 """
 
 import argparse
+import glob
 import json
+import multiprocessing
 import re
 import os
 from typing import List, Dict, Any, Tuple
 
+# orjson serializes several times faster than stdlib json; fall back
+# silently when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 def extract_layer_id(tensor_name: str) -> int:
     """
@@ -412,20 +422,108 @@ def parse_dot_to_json(dot_path: str, token_id: int = None) -> Dict[str, Any]:
     return result
 
 
-def main():
+def convert_file(dot_path: str, output_path: str, token_id: int = None,
+                 pretty: bool = False, verbose: bool = True) -> None:
+    """
+    Parse one .dot file and write its JSON output.
+
+    Args:
+        dot_path: Path to .dot file
+        output_path: Path to output JSON file
+        token_id: Token ID (inferred from filename if None)
+        pretty: Pretty-print JSON output
+        verbose: Print per-file progress
+    """
+    if verbose:
+        print(f"Reading .dot file: {dot_path}")
+    graph_json = parse_dot_to_json(dot_path, token_id)
+
+    if verbose:
+        print(f"Parsed {graph_json['metadata']['total_nodes']} nodes")
+        print(f"Parsed {graph_json['metadata']['total_edges']} edges")
+        print(f"Layers: {graph_json['metadata']['layers']}")
+
+    # Create output directory if needed
+    output_dir = os.path.dirname(output_path)
+    if output_dir and not os.path.exists(output_dir):
+        os.makedirs(output_dir, exist_ok=True)
+
+    # Write JSON (orjson encodes in C when available)
+    if orjson is not None:
+        encoded = orjson.dumps(graph_json, option=orjson.OPT_INDENT_2 if pretty else 0)
+    else:
+        encoded = json.dumps(graph_json, indent=2 if pretty else None).encode()
+    with open(output_path, 'wb') as f:
+        f.write(encoded)
+
+    if verbose:
+        print(f"✓ Graph data written to: {output_path}")
+        print(f"  File size: {len(encoded) / 1024:.1f} KB")
+
+
+def _convert_batch_item(task):
+    """Worker for batch mode (module-level so Pool can pickle it)."""
+    dot_path, output_path, pretty = task
+    convert_file(dot_path, output_path, pretty=pretty, verbose=False)
+    return output_path
+
+
+def convert_batch(batch_dir: str, output_dir: str, pretty: bool = False) -> int:
+    """
+    Convert every token_*.dot in a directory with one process pool.
+
+    Amortizes interpreter startup over all files instead of paying it
+    per token.
+
+    Args:
+        batch_dir: Directory containing token_*.dot files
+        output_dir: Directory for token-*.json outputs
+        pretty: Pretty-print JSON output
+
+    Returns:
+        Number of files converted
+    """
+    dot_files = sorted(glob.glob(os.path.join(batch_dir, 'token_*.dot')))
+    if not dot_files:
+        print(f"No token_*.dot files found in {batch_dir}")
+        return 0
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    tasks = []
+    for dot_path in dot_files:
+        # token_00001.dot -> token-00001.json
+        token_id_str = os.path.basename(dot_path)[:-len('.dot')].split('_')[1]
+        tasks.append((dot_path, os.path.join(output_dir, f'token-{token_id_str}.json'), pretty))
+
+    with multiprocessing.Pool() as pool:
+        for output_path in pool.imap_unordered(_convert_batch_item, tasks):
+            print(f"✓ {output_path}")
+
+    print(f"✓ Converted {len(tasks)} graph files to {output_dir}")
+    return len(tasks)
+
+
+def main(argv=None):
     parser = argparse.ArgumentParser(
-        description='Parse Graphviz .dot file to JSON'
+        description='Parse Graphviz .dot file(s) to JSON'
     )
     parser.add_argument(
         '--dot',
-        required=True,
         help='Path to .dot file (e.g., /tmp/graphs/token_00001.dot)'
     )
     parser.add_argument(
         '--output',
-        required=True,
         help='Path to output JSON file (e.g., data/graphs/token-00001.json)'
     )
+    parser.add_argument(
+        '--batch',
+        help='Directory of token_*.dot files to convert in one invocation'
+    )
+    parser.add_argument(
+        '--output-dir',
+        help='Output directory for batch mode (token-*.json per input)'
+    )
     parser.add_argument(
         '--token-id',
         type=int,
@@ -437,29 +535,18 @@ def main():
         help='Pretty-print JSON output'
     )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
-    # Parse .dot file
-    print(f"Reading .dot file: {args.dot}")
-    graph_json = parse_dot_to_json(args.dot, args.token_id)
-
-    print(f"Parsed {graph_json['metadata']['total_nodes']} nodes")
-    print(f"Parsed {graph_json['metadata']['total_edges']} edges")
-    print(f"Layers: {graph_json['metadata']['layers']}")
-
-    # Create output directory if needed
-    output_dir = os.path.dirname(args.output)
-    if output_dir and not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-        print(f"Created directory: {output_dir}")
+    if args.batch:
+        if not args.output_dir:
+            parser.error('--batch requires --output-dir')
+        convert_batch(args.batch, args.output_dir, pretty=args.pretty)
+        return
 
-    # Write JSON
-    indent = 2 if args.pretty else None
-    with open(args.output, 'w') as f:
-        json.dump(graph_json, f, indent=indent)
+    if not args.dot or not args.output:
+        parser.error('--dot and --output are required (or use --batch/--output-dir)')
 
-    print(f"✓ Graph data written to: {args.output}")
-    print(f"  File size: {os.path.getsize(args.output) / 1024:.1f} KB")
+    convert_file(args.dot, args.output, token_id=args.token_id, pretty=args.pretty)
 
 
 if __name__ == '__main__':
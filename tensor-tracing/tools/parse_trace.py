@@ -18,9 +18,29 @@ Usage:
 import struct
 import sys
 import argparse
+import itertools
 import json
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from collections import Counter, defaultdict
+from functools import lru_cache
+
+# numpy turns the per-entry struct.unpack loop into one C-level bulk
+# decode of the whole file; fall back to the pure-Python parser when
+# it isn't installed
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# orjson serializes the per-token JSON exports several times faster
+# than stdlib json; fall back silently when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # === Structure Definitions (1024-byte format) ===
 
@@ -47,6 +67,49 @@ METADATA_FORMAT = '<QIHHBBB5s'  # timestamp, token_id, layer_id, thread_id, op_t
 # Source format (160 bytes)
 SOURCE_FORMAT = '<128sQIHBBQI4s'  # name[128], tensor_ptr, size_bytes, layer_id, memory_source, pad1, disk_offset_or_buffer_id, tensor_idx, pad2[4]
 
+# Precompiled Struct objects: the format string is parsed once at
+# import instead of on every unpack call
+_METADATA_STRUCT = struct.Struct(METADATA_FORMAT)
+_SOURCE_STRUCT = struct.Struct(SOURCE_FORMAT)
+_EXPERT_IDS_STRUCT = struct.Struct('<16i')
+
+# An all-zero timestamp marks an empty (never-written) entry slot
+_ZERO_TIMESTAMP = bytes(8)
+
+# Structured dtype mirroring the 1024-byte layout, field for field.
+# numpy structured dtypes are packed (no alignment padding), matching
+# the '<' struct formats above.
+if np is not None:
+    SOURCE_DTYPE = np.dtype([
+        ('name', 'S128'),
+        ('tensor_ptr', '<u8'),
+        ('size_bytes', '<u4'),
+        ('layer_id', '<u2'),
+        ('memory_source', 'u1'),
+        ('pad1', 'V1'),
+        ('disk_offset_or_buffer_id', '<u8'),
+        ('tensor_idx', '<u4'),
+        ('pad2', 'V4'),
+    ])
+    assert SOURCE_DTYPE.itemsize == SOURCE_SIZE
+
+    TRACE_DTYPE = np.dtype([
+        ('timestamp_ns', '<u8'),
+        ('token_id', '<u4'),
+        ('layer_id', '<u2'),
+        ('thread_id', '<u2'),
+        ('operation_type', 'u1'),
+        ('phase', 'u1'),
+        ('num_sources', 'u1'),
+        ('meta_pad', 'V5'),
+        ('dst_name', 'S128'),
+        ('sources', SOURCE_DTYPE, (4,)),
+        ('expert_ids', '<i4', (16,)),
+        ('num_experts', 'u1'),
+        ('pad', 'V167'),
+    ])
+    assert TRACE_DTYPE.itemsize == ENTRY_SIZE
+
 # Operation type names (ggml_op enum)
 # IMPORTANT: This MUST match the exact order in ggml/include/ggml.h
 # Last synced: 2026-01-08 from llama.cpp commit
@@ -148,11 +211,23 @@ OPERATION_TYPES = {
     94: "GLU",
 }
 
+# Dense tuple for the per-entry lookup: opcodes are contiguous 0..94,
+# so a plain index beats a dict hash in the parse loop. The dict above
+# stays the documented source of truth.
+_OPERATION_NAMES = tuple(OPERATION_TYPES[i] for i in range(max(OPERATION_TYPES) + 1))
+
+
+def _operation_name(op):
+    """Opcode to name, with the UNKNOWN_<n> fallback for new ops."""
+    if op < len(_OPERATION_NAMES):
+        return _OPERATION_NAMES[op]
+    return f'UNKNOWN_{op}'
+
 
 def parse_source(data, offset):
     """Parse a single SourceTensorInfo (160 bytes)."""
     try:
-        unpacked = struct.unpack_from(SOURCE_FORMAT, data, offset)
+        unpacked = _SOURCE_STRUCT.unpack_from(data, offset)
 
         return {
             'name': unpacked[0].decode('utf-8', errors='ignore').rstrip('\x00'),
@@ -168,22 +243,29 @@ def parse_source(data, offset):
         return None
 
 
-def parse_entry(data, entry_num):
-    """Parse a complete TensorAccessLog (1024 bytes)."""
-    if len(data) < ENTRY_SIZE:
+def parse_entry(data, entry_num, base=0):
+    """Parse a complete TensorAccessLog (1024 bytes) at offset `base`.
+
+    Reads fields with unpack_from at absolute offsets, so `data` can
+    be the whole buffer (or mmap) without slicing a copy per entry.
+    """
+    if len(data) - base < ENTRY_SIZE:
+        return None
+
+    # Probe the timestamp alone before unpacking anything: a zero
+    # timestamp marks an empty entry, and the 8-byte compare is a
+    # C-level memcmp
+    if data[base:base + 8] == _ZERO_TIMESTAMP:
         return None
 
     try:
-        offset = 0
+        offset = base
 
         # Parse metadata (24 bytes)
-        metadata = struct.unpack_from(METADATA_FORMAT, data, offset)
+        metadata = _METADATA_STRUCT.unpack_from(data, offset)
         offset += METADATA_SIZE
 
         timestamp_ns = metadata[0]
-        if timestamp_ns == 0:  # Empty entry
-            return None
-
         token_id = metadata[1]
         layer_id = metadata[2] if metadata[2] != 65535 else None
         thread_id = metadata[3]
@@ -196,21 +278,22 @@ def parse_entry(data, entry_num):
         dst_name = data[offset:offset+DST_NAME_SIZE].decode('utf-8', errors='ignore').rstrip('\x00')
         offset += DST_NAME_SIZE
 
-        # Parse sources (4 × 160 bytes)
+        # Parse only the occupied source slots (most ops use 1-2 of
+        # the 4); the unused tail is skipped by advancing past the
+        # whole 640-byte region afterwards
         sources = []
-        for i in range(4):
-            src = parse_source(data, offset)
-            if src and i < num_sources:  # Only include valid sources
+        for i in range(min(num_sources, 4)):
+            src = parse_source(data, offset + i * SOURCE_SIZE)
+            if src:
                 sources.append(src)
-            offset += SOURCE_SIZE
+        offset += SOURCES_TOTAL_SIZE
 
         # Parse expert IDs (64 bytes = 16 × int32)
-        expert_ids_format = '<16i'  # 16 int32 values
-        expert_ids_raw = struct.unpack_from(expert_ids_format, data, offset)
+        expert_ids_raw = _EXPERT_IDS_STRUCT.unpack_from(data, offset)
         offset += EXPERT_IDS_SIZE
 
         # Parse num_experts (1 byte)
-        num_experts = struct.unpack_from('<B', data, offset)[0]
+        num_experts = data[offset]
         offset += NUM_EXPERTS_SIZE
 
         # Extract only valid expert IDs
@@ -219,13 +302,12 @@ def parse_entry(data, entry_num):
         # Remaining padding (167 bytes) - skip
 
         return {
-            'entry_num': entry_num,
             'timestamp_ns': timestamp_ns,
             'token_id': token_id,
             'layer_id': layer_id,
             'thread_id': thread_id,
             'operation_type': operation_type,
-            'operation_name': OPERATION_TYPES.get(operation_type, f'UNKNOWN_{operation_type}'),
+            'operation_name': _operation_name(operation_type),
             'phase': 'PROMPT' if phase == 0 else 'GENERATE',
             'num_sources': num_sources,
             'dst_name': dst_name,
@@ -238,107 +320,346 @@ def parse_entry(data, entry_num):
         return None
 
 
+def _iter_entries_struct(buf, max_entries=None):
+    """Yield entries one record at a time with struct.unpack (fallback).
+
+    unpack_from reads at absolute offsets, so no per-entry 1024-byte
+    slice is allocated. Generator so aggregate-only consumers never
+    hold the whole trace as dicts at once.
+    """
+    num_records = len(buf) // ENTRY_SIZE
+    if max_entries is not None:
+        num_records = min(num_records, max_entries)
+
+    for entry_num in range(num_records):
+        entry = parse_entry(buf, entry_num, base=entry_num * ENTRY_SIZE)
+        if entry is None:
+            break
+        yield entry
+
+
+def _parse_entries_struct(buf, max_entries=None):
+    """Parse a trace buffer into a list of entry dicts (fallback)."""
+    return list(_iter_entries_struct(buf, max_entries))
+
+
+def trace_array(buf, max_entries=None):
+    """View a trace buffer as a structured array (numpy only).
+
+    Zero-copy np.frombuffer view, trimmed at the first zero-timestamp
+    (empty) record. The buffer must stay alive as long as the array.
+
+    Args:
+        buf: Bytes-like object containing whole 1024-byte records
+        max_entries: Parse at most this many records (None = all)
+
+    Returns:
+        Structured ndarray with TRACE_DTYPE
+    """
+    count = len(buf) // ENTRY_SIZE
+    if max_entries is not None:
+        count = min(count, max_entries)
+    arr = np.frombuffer(buf, dtype=TRACE_DTYPE, count=count)
+    zeros = np.flatnonzero(arr['timestamp_ns'] == 0)
+    if zeros.size:
+        arr = arr[:zeros[0]]
+    return arr
+
+
+def _entries_from_array(arr):
+    """Convert a structured trace array into entry dicts (numpy only).
+
+    One tolist() call converts the whole array to Python scalars in C,
+    replacing ~10 struct.unpack calls per entry; the dicts match what
+    parse_entry produces.
+    """
+    # Decode the name columns in bulk: np.char.decode runs the UTF-8
+    # decode over the whole S128 column in C (trailing NULs are already
+    # dropped by the S dtype), replacing up to 5 per-entry
+    # decode/rstrip calls with two vectorized ones
+    dst_names = np.char.decode(arr['dst_name'], 'utf-8', 'ignore').tolist()
+    src_names = np.char.decode(arr['sources']['name'], 'utf-8', 'ignore').tolist()
+
+    entries = []
+    for i, row in enumerate(arr.tolist()):
+        (timestamp_ns, token_id, layer_id, thread_id, operation_type,
+         phase, num_sources, _pad, _dst_name, sources_raw,
+         expert_ids_raw, num_experts, _pad2) = row
+
+        # tolist() does not recurse into the nested source records or
+        # the expert_ids subarray — their elements come back as numpy
+        # scalars, which neither json nor orjson can serialize — so
+        # cast them to Python ints here
+        sources = []
+        row_src_names = src_names[i]
+        for j, src in enumerate(sources_raw[:num_sources]):
+            (_name, tensor_ptr, size_bytes, src_layer_id, memory_source,
+             _spad1, disk_offset_or_buffer_id, tensor_idx, _spad2) = src
+            sources.append({
+                'name': row_src_names[j],
+                'tensor_ptr': int(tensor_ptr),
+                'size_bytes': int(size_bytes),
+                'layer_id': int(src_layer_id) if src_layer_id != 65535 else None,
+                'memory_source': 'DISK' if memory_source == 0 else 'BUFFER',
+                'disk_offset_or_buffer_id': int(disk_offset_or_buffer_id),
+                'tensor_idx': int(tensor_idx) if tensor_idx != 0xFFFFFFFF else None,
+            })
+
+        entries.append({
+            'timestamp_ns': timestamp_ns,
+            'token_id': token_id,
+            'layer_id': layer_id if layer_id != 65535 else None,
+            'thread_id': thread_id,
+            'operation_type': operation_type,
+            'operation_name': _operation_name(operation_type),
+            'phase': 'PROMPT' if phase == 0 else 'GENERATE',
+            'num_sources': num_sources,
+            'dst_name': dst_names[i],
+            'sources': sources,
+            'expert_ids': [int(x) for x in expert_ids_raw[:num_experts]] if num_experts > 0 else [],
+            'num_experts': num_experts,
+        })
+
+    return entries
+
+
+def parse_entries(buf):
+    """Parse a trace buffer into a list of entry dicts.
+
+    Uses the vectorized numpy decoder when numpy is available, else
+    the per-record struct fallback; both stop at the first
+    zero-timestamp (empty) entry.
+
+    Args:
+        buf: Bytes-like object containing whole 1024-byte records
+
+    Returns:
+        List of entry dicts
+    """
+    if np is not None:
+        return _entries_from_array(trace_array(buf))
+    return _parse_entries_struct(buf)
+
+
+# (threshold, divisor, suffix), largest first
+_SIZE_UNITS = (
+    (1 << 20, 1 << 20, 'MB'),
+    (1 << 10, 1 << 10, 'KB'),
+)
+
+
+@lru_cache(maxsize=8192)
 def format_size(size_bytes):
-    """Format size in human-readable format."""
-    if size_bytes < 1024:
-        return f"{size_bytes}B"
-    elif size_bytes < 1024 * 1024:
-        return f"{size_bytes / 1024:.1f}KB"
-    else:
-        return f"{size_bytes / (1024 * 1024):.1f}MB"
+    """Format size in human-readable format.
+
+    Cached: traces repeat a handful of distinct tensor sizes (KV cache
+    rows, FFN widths) thousands of times, so nearly every call after
+    the first few is a dict hit instead of a divide + format.
+    """
+    for threshold, divisor, suffix in _SIZE_UNITS:
+        if size_bytes >= threshold:
+            return f"{size_bytes / divisor:.1f}{suffix}"
+    return f"{size_bytes}B"
 
 
 def display_entries(entries, limit=0):
-    """Display trace entries in detailed format."""
+    """Display trace entries in detailed format.
+
+    Lines are batched into a list and written to stdout in chunks
+    rather than one print() (lock + write) per line, which dominates
+    when dumping large traces.
+    """
     if limit > 0:
         entries = entries[:limit]
 
-    for entry in entries:
+    lines = []
+    for i, entry in enumerate(entries):
         time_ms = entry['timestamp_ns'] / 1_000_000
         layer_str = f"L{entry['layer_id']}" if entry['layer_id'] is not None else "N/A"
 
-        print(f"\n=== Entry #{entry['entry_num']} ===")
-        print(f"  Time: {time_ms:.3f} ms")
-        print(f"  Token: {entry['token_id']}, Layer: {layer_str}, Thread: {entry['thread_id']}")
-        print(f"  Operation: {entry['operation_name']}, Phase: {entry['phase']}")
-        print(f"  Destination: '{entry['dst_name']}'")
+        lines.append(f"\n=== Entry #{i} ===")
+        lines.append(f"  Time: {time_ms:.3f} ms")
+        lines.append(f"  Token: {entry['token_id']}, Layer: {layer_str}, Thread: {entry['thread_id']}")
+        lines.append(f"  Operation: {entry['operation_name']}, Phase: {entry['phase']}")
+        lines.append(f"  Destination: '{entry['dst_name']}'")
 
         # Show expert IDs if present
         if entry.get('num_experts', 0) > 0:
             top4 = entry['expert_ids'][:4]  # Show top-4 (actually used)
             all_ids = entry['expert_ids']
-            print(f"  Experts: TOP-4: {top4}, All: {all_ids}")
+            lines.append(f"  Experts: TOP-4: {top4}, All: {all_ids}")
 
-        print(f"  Sources ({entry['num_sources']}):")
+        lines.append(f"  Sources ({entry['num_sources']}):")
 
         for i, src in enumerate(entry['sources']):
             size_str = format_size(src['size_bytes'])
             layer_str = f"L{src['layer_id']}" if src['layer_id'] is not None else "N/A"
 
-            print(f"    [{i}] '{src['name']}' - {size_str} - {src['memory_source']}")
+            lines.append(f"    [{i}] '{src['name']}' - {size_str} - {src['memory_source']}")
 
             if src['memory_source'] == 'DISK':
-                print(f"        Disk offset: 0x{src['disk_offset_or_buffer_id']:X}")
+                lines.append(f"        Disk offset: 0x{src['disk_offset_or_buffer_id']:X}")
             else:
-                print(f"        Buffer ID: 0x{src['disk_offset_or_buffer_id']:X}")
+                lines.append(f"        Buffer ID: 0x{src['disk_offset_or_buffer_id']:X}")
 
             if src['tensor_idx'] is not None:
-                print(f"        Tensor idx: {src['tensor_idx']}")
+                lines.append(f"        Tensor idx: {src['tensor_idx']}")
+
+        # Flush periodically so unbounded dumps keep memory flat
+        if len(lines) >= 65536:
+            sys.stdout.write('\n'.join(lines) + '\n')
+            lines.clear()
+
+    if lines:
+        sys.stdout.write('\n'.join(lines) + '\n')
+
+
+def _show_statistics_numpy(arr):
+    """show_statistics over the structured array (numpy only).
+
+    Column (SoA) reductions instead of per-entry dict lookups: each
+    aggregate is a C-speed scan over one contiguous field.
+    """
+    print("\n=== Trace Statistics ===\n")
+    print(f"Total entries: {len(arr)}")
+
+    # Time range
+    timestamps = arr['timestamp_ns']
+    duration_ms = int(timestamps[-1] - timestamps[0]) / 1_000_000
+    print(f"Duration: {duration_ms:.3f} ms")
+
+    # Token distribution
+    tokens = np.unique(arr['token_id'])
+    print(f"\nTokens: {[int(t) for t in tokens]}")
+
+    # Layer distribution (65535 is the no-layer sentinel)
+    layer_ids = arr['layer_id']
+    layers = np.unique(layer_ids[layer_ids != 65535])
+    print(f"\nLayers accessed: {[int(l) for l in layers]}")
+    print(f"Unique layers: {len(layers)}")
 
+    # Operation types
+    op_counts = np.bincount(arr['operation_type'], minlength=256)
+    print(f"\nOperation distribution:")
+    for op_type in np.argsort(op_counts)[::-1]:
+        count = int(op_counts[op_type])
+        if count == 0:
+            break
+        op_name = _operation_name(int(op_type))
+        pct = (count / len(arr)) * 100
+        print(f"  {op_name:<20}: {count:>4} ({pct:>5.1f}%)")
 
-def show_statistics(entries):
+    # Source analysis
+    num_sources = arr['num_sources']
+    total_sources = int(num_sources.sum())
+    avg_sources = total_sources / len(arr)
+    print(f"\nSource tensors:")
+    print(f"  Total: {total_sources}")
+    print(f"  Average per operation: {avg_sources:.2f}")
+
+    # Valid-source mask: slot i of an entry counts only if i < num_sources
+    valid = np.arange(4)[None, :] < num_sources[:, None]
+    sources = arr['sources']
+
+    if total_sources > 0:
+        mem_sources = sources['memory_source'][valid]
+        num_disk = int((mem_sources == 0).sum())
+        print(f"\nMemory source distribution:")
+        for mem_type, count in (('DISK', num_disk), ('BUFFER', len(mem_sources) - num_disk)):
+            if count:
+                pct = (count / len(mem_sources)) * 100
+                print(f"  {mem_type}: {count} ({pct:.1f}%)")
+
+    # Unique tensors
+    names = sources['name'][valid]
+    unique_sources = np.unique(names[names != b''])
+    print(f"\nUnique source tensors: {len(unique_sources)}")
+
+    # Data volume
+    total_bytes = int(sources['size_bytes'][valid].sum(dtype=np.uint64))
+    print(f"\nTotal data accessed: {format_size(total_bytes)}")
+
+
+def show_statistics(entries, arr=None):
     """Show comprehensive statistics."""
-    if not entries:
+    if arr is not None and len(arr):
+        _show_statistics_numpy(arr)
+        return
+
+    # Single fused pass: every aggregate below accumulates while the
+    # entries (and each entry's sources) are walked exactly once.
+    # Accepts any iterable, so a streamed parse never has to hold the
+    # whole trace as dicts.
+    num_entries = 0
+    first_ts = 0
+    last_ts = 0
+    token_counts = Counter()
+    layer_counts = Counter()
+    op_counts = Counter()
+    mem_source_counts = Counter()
+    unique_sources = set()
+    total_sources = 0
+    num_src_records = 0
+    total_bytes = 0
+
+    for e in entries:
+        if num_entries == 0:
+            first_ts = e['timestamp_ns']
+        last_ts = e['timestamp_ns']
+        num_entries += 1
+        token_counts[e['token_id']] += 1
+        if e['layer_id'] is not None:
+            layer_counts[e['layer_id']] += 1
+        op_counts[e['operation_name']] += 1
+        total_sources += e['num_sources']
+        for src in e['sources']:
+            num_src_records += 1
+            mem_source_counts[src['memory_source']] += 1
+            if src['name']:
+                unique_sources.add(src['name'])
+            total_bytes += src['size_bytes']
+
+    if num_entries == 0:
         print("No entries to analyze")
         return
 
     print("\n=== Trace Statistics ===\n")
-    print(f"Total entries: {len(entries)}")
+    print(f"Total entries: {num_entries}")
 
     # Time range
-    first_ts = entries[0]['timestamp_ns']
-    last_ts = entries[-1]['timestamp_ns']
     duration_ms = (last_ts - first_ts) / 1_000_000
     print(f"Duration: {duration_ms:.3f} ms")
 
     # Token distribution
-    token_counts = Counter(e['token_id'] for e in entries)
     print(f"\nTokens: {list(token_counts.keys())}")
 
     # Layer distribution
-    layer_counts = Counter(e['layer_id'] for e in entries if e['layer_id'] is not None)
     print(f"\nLayers accessed: {sorted(layer_counts.keys())}")
     print(f"Unique layers: {len(layer_counts)}")
 
     # Operation types
-    op_counts = Counter(e['operation_name'] for e in entries)
     print(f"\nOperation distribution:")
     for op_name, count in op_counts.most_common():
-        pct = (count / len(entries)) * 100
+        pct = (count / num_entries) * 100
         print(f"  {op_name:<20}: {count:>4} ({pct:>5.1f}%)")
 
     # Source analysis
-    total_sources = sum(e['num_sources'] for e in entries)
-    avg_sources = total_sources / len(entries) if entries else 0
+    avg_sources = total_sources / num_entries
     print(f"\nSource tensors:")
     print(f"  Total: {total_sources}")
     print(f"  Average per operation: {avg_sources:.2f}")
 
     # Memory source distribution
-    all_sources = [src for e in entries for src in e['sources']]
-    if all_sources:
-        mem_source_counts = Counter(src['memory_source'] for src in all_sources)
+    if num_src_records:
         print(f"\nMemory source distribution:")
         for mem_type, count in mem_source_counts.items():
-            pct = (count / len(all_sources)) * 100
+            pct = (count / num_src_records) * 100
             print(f"  {mem_type}: {count} ({pct:.1f}%)")
 
     # Unique tensors
-    unique_sources = set(src['name'] for src in all_sources if src['name'])
     print(f"\nUnique source tensors: {len(unique_sources)}")
 
     # Data volume
-    total_bytes = sum(src['size_bytes'] for src in all_sources)
     print(f"\nTotal data accessed: {format_size(total_bytes)}")
 
 
@@ -346,50 +667,75 @@ def verify_format(entries):
     """Verify the trace format is correct."""
     print("\n=== Format Verification ===\n")
 
-    if not entries:
+    issues = []
+
+    # Every check below is a count over the entries or their sources;
+    # accumulate them all in one pass instead of re-walking the list
+    # (and re-flattening the sources) per check. Accepts any iterable.
+    num_entries = 0
+    entries_with_sources = 0
+    entries_with_dst = 0
+    total_sources = 0
+    sources_with_names = 0
+    disk_sources = 0
+    buffer_sources = 0
+    disk_with_offsets = 0
+    valid_ops = 0
+    unique_layers = set()
+
+    for e in entries:
+        num_entries += 1
+        if e['num_sources'] > 0:
+            entries_with_sources += 1
+        if e['dst_name']:
+            entries_with_dst += 1
+        if e['operation_name'] != f"UNKNOWN_{e['operation_type']}":
+            valid_ops += 1
+        if e['layer_id'] is not None:
+            unique_layers.add(e['layer_id'])
+        for src in e['sources']:
+            total_sources += 1
+            if src['name']:
+                sources_with_names += 1
+            if src['memory_source'] == 'DISK':
+                disk_sources += 1
+                if src['disk_offset_or_buffer_id'] > 0:
+                    disk_with_offsets += 1
+            else:
+                buffer_sources += 1
+
+    if num_entries == 0:
         print("❌ No entries found")
         return False
 
-    issues = []
-
     # Check entry count
-    print(f"✓ Found {len(entries)} entries")
+    print(f"✓ Found {num_entries} entries")
 
     # Check if entries have valid sources
-    entries_with_sources = [e for e in entries if e['num_sources'] > 0]
-    print(f"✓ Entries with sources: {len(entries_with_sources)} / {len(entries)}")
+    print(f"✓ Entries with sources: {entries_with_sources} / {num_entries}")
 
     # Check destination names
-    entries_with_dst = [e for e in entries if e['dst_name']]
-    print(f"✓ Entries with destination names: {len(entries_with_dst)} / {len(entries)}")
+    print(f"✓ Entries with destination names: {entries_with_dst} / {num_entries}")
 
     # Check source names
-    all_sources = [src for e in entries for src in e['sources']]
-    sources_with_names = [src for src in all_sources if src['name']]
-    print(f"✓ Sources with names: {len(sources_with_names)} / {len(all_sources)}")
+    print(f"✓ Sources with names: {sources_with_names} / {total_sources}")
 
     # Check memory source detection
-    disk_sources = [src for src in all_sources if src['memory_source'] == 'DISK']
-    buffer_sources = [src for src in all_sources if src['memory_source'] == 'BUFFER']
-    print(f"✓ DISK sources: {len(disk_sources)}")
-    print(f"✓ BUFFER sources: {len(buffer_sources)}")
+    print(f"✓ DISK sources: {disk_sources}")
+    print(f"✓ BUFFER sources: {buffer_sources}")
 
     # Check disk offsets
-    disk_with_offsets = [src for src in disk_sources if src['disk_offset_or_buffer_id'] > 0]
     if disk_sources:
-        offset_pct = (len(disk_with_offsets) / len(disk_sources)) * 100
-        print(f"✓ DISK sources with non-zero offsets: {len(disk_with_offsets)} / {len(disk_sources)} ({offset_pct:.1f}%)")
+        offset_pct = (disk_with_offsets / disk_sources) * 100
+        print(f"✓ DISK sources with non-zero offsets: {disk_with_offsets} / {disk_sources} ({offset_pct:.1f}%)")
         if offset_pct < 50:
             issues.append(f"⚠️  Only {offset_pct:.1f}% of DISK sources have non-zero offsets")
 
     # Check operation types
-    valid_ops = [e for e in entries if e['operation_name'] != f"UNKNOWN_{e['operation_type']}"]
-    print(f"✓ Valid operation types: {len(valid_ops)} / {len(entries)}")
+    print(f"✓ Valid operation types: {valid_ops} / {num_entries}")
 
     # Check layers
-    entries_with_layer = [e for e in entries if e['layer_id'] is not None]
-    if entries_with_layer:
-        unique_layers = set(e['layer_id'] for e in entries_with_layer)
+    if unique_layers:
         print(f"✓ Unique layers: {len(unique_layers)} (expecting 22 for TinyLlama)")
         if len(unique_layers) < 22:
             issues.append(f"⚠️  Only {len(unique_layers)} layers captured (expected 22)")
@@ -405,13 +751,14 @@ def verify_format(entries):
         return True
 
 
-def export_to_json_per_token(entries, output_dir):
+def export_to_json_per_token(entries, output_dir, pretty=False):
     """
     Export trace entries as JSON files, one per token.
 
     Args:
         entries: List of parsed trace entries
         output_dir: Directory to write JSON files (e.g., 'webui/public/data/traces/')
+        pretty: Indent the JSON output (default: compact)
 
     Returns:
         Number of token files written
@@ -425,94 +772,217 @@ def export_to_json_per_token(entries, output_dir):
         token_id = entry['token_id']
         entries_by_token[token_id].append(entry)
 
-    # Write one JSON file per token
-    num_files = 0
-    for token_id in sorted(entries_by_token.keys()):
-        token_entries = entries_by_token[token_id]
-
-        # Compute metadata for this token
-        timestamps = [e['timestamp_ns'] for e in token_entries]
-        timestamp_start = min(timestamps)
-        timestamp_end = max(timestamps)
-        duration_ms = (timestamp_end - timestamp_start) / 1_000_000  # ns -> ms
-
-        # Format entries for JSON export
-        formatted_entries = []
-        for i, entry in enumerate(token_entries):
-            # Format sources with proper field names
-            formatted_sources = []
-            for src in entry['sources']:
-                formatted_src = {
-                    'name': src['name'],
-                    'tensor_ptr': f"0x{src['tensor_ptr']:x}",  # Format as hex string
-                    'size_bytes': src['size_bytes'],
-                    'layer_id': src['layer_id'],
-                    'memory_source': src['memory_source']
-                }
-
-                # Add disk_offset or buffer_id based on memory source
-                if src['memory_source'] == 'DISK':
-                    formatted_src['disk_offset'] = src['disk_offset_or_buffer_id']
-                else:
-                    formatted_src['buffer_id'] = src['disk_offset_or_buffer_id']
-
-                formatted_sources.append(formatted_src)
-
-            formatted_entry = {
-                'entry_id': i,
-                'timestamp_ns': entry['timestamp_ns'],
-                'timestamp_relative_ms': round((entry['timestamp_ns'] - timestamp_start) / 1_000_000, 3),
-                'token_id': token_id,
-                'layer_id': entry['layer_id'],
-                'thread_id': entry['thread_id'],
-                'phase': entry['phase'],
-                'operation_type': entry['operation_name'],
-                'dst_name': entry['dst_name'],
-                'num_sources': entry['num_sources'],
-                'sources': formatted_sources,
-                'expert_ids': entry.get('expert_ids', []),      # NEW
-                'num_experts': entry.get('num_experts', 0)      # NEW
+    # Token files are independent, so serialize and write them in
+    # parallel: encoding releases the GIL in the C encoder and the
+    # small writes overlap. map() preserves order for the progress
+    # lines.
+    tokens = sorted(entries_by_token.keys())
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = executor.map(
+            lambda token_id: _export_one_token(
+                token_id, entries_by_token[token_id], output_path, pretty),
+            tokens)
+        for token_id, num_entries, output_file, file_size_kb in results:
+            print(f"✓ Token {token_id:5d}: {num_entries:4d} entries → {output_file} ({file_size_kb:.1f} KB)")
+
+    return len(tokens)
+
+
+def _iter_entries_array(arr, chunk=65536):
+    """Yield entry dicts from a structured array in bounded chunks.
+
+    Keeps the bulk tolist()/np.char.decode conversion but only ever
+    holds one chunk of dicts, so streaming consumers stay O(chunk).
+    """
+    for start in range(0, len(arr), chunk):
+        yield from _entries_from_array(arr[start:start + chunk])
+
+
+def export_to_jsonl(entries, output_file):
+    """
+    Export trace entries as JSON Lines, one object per line.
+
+    Entries are encoded and written as they arrive, so peak memory is
+    one entry and traces larger than RAM can be converted; downstream
+    tools can stream-parse the output line by line.
+
+    Args:
+        entries: Iterable of parsed trace entries
+        output_file: Path of the .jsonl file to write
+
+    Returns:
+        Number of entries written
+    """
+    output_path = Path(output_file)
+    if output_path.parent != Path('.'):
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if orjson is not None:
+        dumps = orjson.dumps
+    else:
+        dumps = lambda obj: json.dumps(obj).encode()
+
+    count = 0
+    with open(output_path, 'wb') as f:
+        for entry in entries:
+            f.write(dumps(entry))
+            f.write(b'\n')
+            count += 1
+    return count
+
+
+def export_tokens_from_array(arr, output_dir, pretty=False):
+    """
+    Export per-token JSON files straight from the structured array.
+
+    numpy-path counterpart of export_to_json_per_token: entry dicts are
+    materialized one token at a time inside the workers instead of for
+    the whole trace up front, so peak dict memory is bounded by the
+    largest token (times the worker count) rather than the full trace.
+
+    Args:
+        arr: Structured trace array (TRACE_DTYPE)
+        output_dir: Directory to write JSON files (e.g., 'webui/public/data/traces/')
+        pretty: Indent the JSON output (default: compact)
+
+    Returns:
+        Number of token files written
+    """
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    # Group by token with one sort + split instead of a boolean-mask
+    # scan of the whole array per token. The tracer writes entries in
+    # token order, so the common case skips the argsort entirely and
+    # np.split just hands out contiguous views.
+    token_steps = np.diff(arr['token_id'].astype(np.int64))
+    if np.all(token_steps >= 0):
+        sorted_arr = arr
+    else:
+        sorted_arr = arr[np.argsort(arr['token_id'], kind='stable')]
+        token_steps = np.diff(sorted_arr['token_id'].astype(np.int64))
+    groups = np.split(sorted_arr, np.flatnonzero(token_steps) + 1)
+
+    def _export_token(sub):
+        # Relative timestamps in one vectorized op per token instead
+        # of a round() call per entry
+        ts = sub['timestamp_ns'].astype(np.int64)
+        rel_ms = np.round((ts - ts.min()) / 1e6, 3).tolist()
+        token_entries = _entries_from_array(sub)
+        return _export_one_token(int(sub['token_id'][0]), token_entries,
+                                 output_path, pretty, rel_ms=rel_ms)
+
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = executor.map(_export_token, groups)
+        for token_id, num_entries, output_file, file_size_kb in results:
+            print(f"✓ Token {token_id:5d}: {num_entries:4d} entries → {output_file} ({file_size_kb:.1f} KB)")
+
+    return len(groups)
+
+
+def _export_one_token(token_id, token_entries, output_path, pretty, rel_ms=None):
+    """Serialize and write one token's JSON file.
+
+    Args:
+        rel_ms: Optional precomputed per-entry relative timestamps in
+            ms (the numpy path computes them vectorized)
+
+    Returns:
+        Tuple of (token_id, num_entries, output_file, file_size_kb)
+    """
+    # Compute metadata for this token
+    timestamps = [e['timestamp_ns'] for e in token_entries]
+    timestamp_start = min(timestamps)
+    timestamp_end = max(timestamps)
+    duration_ms = (timestamp_end - timestamp_start) / 1_000_000  # ns -> ms
+
+    if rel_ms is None:
+        rel_ms = [round((ts - timestamp_start) / 1_000_000, 3) for ts in timestamps]
+
+    # Format entries for JSON export
+    formatted_entries = []
+    for i, entry in enumerate(token_entries):
+        # Format sources with proper field names
+        formatted_sources = []
+        for src in entry['sources']:
+            formatted_src = {
+                'name': src['name'],
+                'tensor_ptr': "0x%x" % src['tensor_ptr'],  # Hex string; %-format beats f-string here
+                'size_bytes': src['size_bytes'],
+                'layer_id': src['layer_id'],
+                'memory_source': src['memory_source']
             }
-            formatted_entries.append(formatted_entry)
 
-        # Build JSON structure
-        token_json = {
-            'token_id': token_id,
-            'metadata': {
-                'total_entries': len(token_entries),
-                'duration_ms': round(duration_ms, 3),
-                'timestamp_start_ns': timestamp_start,
-                'format_version': '1024-byte'
-            },
-            'entries': formatted_entries
-        }
+            # Add disk_offset or buffer_id based on memory source
+            if src['memory_source'] == 'DISK':
+                formatted_src['disk_offset'] = src['disk_offset_or_buffer_id']
+            else:
+                formatted_src['buffer_id'] = src['disk_offset_or_buffer_id']
 
-        # Write to file
-        output_file = output_path / f"token-{token_id:05d}.json"
-        with open(output_file, 'w') as f:
-            json.dump(token_json, f, indent=2)
+            formatted_sources.append(formatted_src)
 
-        file_size_kb = output_file.stat().st_size / 1024
-        print(f"✓ Token {token_id:5d}: {len(token_entries):4d} entries → {output_file} ({file_size_kb:.1f} KB)")
-        num_files += 1
+        formatted_entry = {
+            'entry_id': i,
+            'timestamp_ns': entry['timestamp_ns'],
+            'timestamp_relative_ms': rel_ms[i],
+            'token_id': token_id,
+            'layer_id': entry['layer_id'],
+            'thread_id': entry['thread_id'],
+            'phase': entry['phase'],
+            'operation_type': entry['operation_name'],
+            'dst_name': entry['dst_name'],
+            'num_sources': entry['num_sources'],
+            'sources': formatted_sources,
+            'expert_ids': entry.get('expert_ids', []),      # NEW
+            'num_experts': entry.get('num_experts', 0)      # NEW
+        }
+        formatted_entries.append(formatted_entry)
+
+    # Build JSON structure
+    token_json = {
+        'token_id': token_id,
+        'metadata': {
+            'total_entries': len(token_entries),
+            'duration_ms': round(duration_ms, 3),
+            'timestamp_start_ns': timestamp_start,
+            'format_version': '1024-byte'
+        },
+        'entries': formatted_entries
+    }
+
+    # Write to file
+    # Compact by default: the WebUI is the consumer and indentation
+    # roughly doubles both encode time and file size
+    output_file = output_path / f"token-{token_id:05d}.json"
+    if orjson is not None:
+        encoded = orjson.dumps(token_json, option=orjson.OPT_INDENT_2 if pretty else 0)
+    else:
+        encoded = json.dumps(token_json, indent=2 if pretty else None).encode()
+    output_file.write_bytes(encoded)
 
-    return num_files
+    return (token_id, len(token_entries), output_file, len(encoded) / 1024)
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Parse tensor trace binary (1024-byte format with 128-byte names)')
     parser.add_argument('trace_file', nargs='?', default='/tmp/tensor_trace.bin',
                         help='Path to trace binary (default: /tmp/tensor_trace.bin)')
     parser.add_argument('--limit', type=int, default=0,
                         help='Limit number of entries to display (0 = all)')
+    parser.add_argument('--layer', type=int, default=None,
+                        help='Only consider entries for this layer ID')
     parser.add_argument('--stats', action='store_true',
                         help='Show statistics')
     parser.add_argument('--verify', action='store_true',
                         help='Verify format correctness')
     parser.add_argument('--export-json', type=str, metavar='OUTPUT_DIR',
                         help='Export entries to JSON files per token (e.g., webui/public/data/traces/)')
+    parser.add_argument('--export-jsonl', type=str, metavar='OUTPUT_FILE',
+                        help='Export entries as JSON Lines, one object per line (streams, so works for traces larger than RAM)')
+    parser.add_argument('--pretty', action='store_true',
+                        help='Indent exported JSON (default: compact)')
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Load trace file
     trace_path = Path(args.trace_file)
@@ -527,41 +997,113 @@ def main():
     print(f"File size: {file_size / (1024*1024):.2f} MB ({file_size} bytes)")
     print(f"Expected entries: {expected_entries} (at 1024 bytes each)\n")
 
-    # Parse entries
-    entries = []
-    with open(trace_path, 'rb') as f:
-        entry_num = 0
-        while True:
-            data = f.read(ENTRY_SIZE)
-            if len(data) < ENTRY_SIZE:
-                break
-
-            entry = parse_entry(data, entry_num)
-            if entry is None:
-                break
-
-            entries.append(entry)
-            entry_num += 1
-
-    print(f"✓ Parsed {len(entries)} entries\n")
-
-    if not entries:
-        print("No valid entries found", file=sys.stderr)
-        return 1
-
-    # Execute requested action
-    if args.export_json:
-        print(f"\nExporting to JSON (grouped by token)...")
-        num_files = export_to_json_per_token(entries, args.export_json)
-        print(f"\n✓ Exported {num_files} token files to {args.export_json}")
-    elif args.verify:
-        verify_format(entries)
-    elif args.stats:
-        show_statistics(entries)
+    # Parse entries in one bulk pass, straight out of a read-only
+    # mapping: no bulk copy into a Python bytes object, and the kernel
+    # pages the file in lazily with sequential readahead. The mapping
+    # (and the structured array viewing it) stays alive until the
+    # requested action finishes.
+    arr = None
+    mm = None
+    streaming = False
+    if file_size == 0:
+        entries = []
     else:
-        display_entries(entries, args.limit if args.limit > 0 else 10)
-        if args.limit == 0:
-            print(f"\n... ({len(entries) - 10} more entries, use --limit to show more)")
+        with open(trace_path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(mm, 'madvise'):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        # Display mode with --limit only ever shows the first N
+        # entries, so don't parse past them (stats/verify/export and
+        # --layer still need the whole file)
+        max_entries = None
+        if (args.limit > 0 and args.layer is None
+                and not (args.export_json or args.export_jsonl
+                         or args.verify or args.stats)):
+            max_entries = args.limit
+
+        # Optional layer filter, applied before entry dicts are built.
+        # On the numpy path this is one vectorized compare over the
+        # contiguous uint16 layer_id column rather than a per-entry
+        # Python loop.
+        if np is not None:
+            arr = trace_array(mm, max_entries)
+            if args.layer is not None:
+                arr = arr[arr['layer_id'] == np.uint16(args.layer)]
+            # Stats read the array columns directly and export builds
+            # its dicts per token, so neither needs the whole trace
+            # expanded into dicts up front
+            if args.stats or args.export_json:
+                entries = []
+            elif args.export_jsonl:
+                entries = _iter_entries_array(arr)
+            else:
+                entries = _entries_from_array(arr)
+        elif args.stats or args.verify or args.export_jsonl:
+            # Stream the records into the aggregating consumers
+            # instead of holding ~1 KB of dicts per record for the
+            # whole trace; both report their own entry counts
+            streaming = True
+            entries = _iter_entries_struct(mm, max_entries)
+            if args.layer is not None:
+                entries = (e for e in entries if e['layer_id'] == args.layer)
+        else:
+            entries = _parse_entries_struct(mm, max_entries)
+            if args.layer is not None:
+                entries = [e for e in entries if e['layer_id'] == args.layer]
+
+    if not streaming:
+        num_entries = len(arr) if arr is not None else len(entries)
+        if args.layer is not None:
+            print(f"✓ Parsed {num_entries} entries (layer {args.layer} only)\n")
+        else:
+            print(f"✓ Parsed {num_entries} entries\n")
+
+        if not num_entries:
+            print("No valid entries found", file=sys.stderr)
+            return 1
+    else:
+        # The streaming consumers can't look ahead, so peek one record
+        # to keep the empty-trace exit code identical to the numpy path
+        first_entry = next(entries, None)
+        if first_entry is None:
+            print("No valid entries found", file=sys.stderr)
+            return 1
+        entries = itertools.chain((first_entry,), entries)
+
+    try:
+        # Execute requested action
+        if args.export_json:
+            print(f"\nExporting to JSON (grouped by token)...")
+            if arr is not None:
+                num_files = export_tokens_from_array(arr, args.export_json, pretty=args.pretty)
+            else:
+                num_files = export_to_json_per_token(entries, args.export_json, pretty=args.pretty)
+            print(f"\n✓ Exported {num_files} token files to {args.export_json}")
+        elif args.export_jsonl:
+            print(f"\nExporting to JSON Lines...")
+            num_exported = export_to_jsonl(entries, args.export_jsonl)
+            print(f"\n✓ Exported {num_exported} entries to {args.export_jsonl}")
+        elif args.verify:
+            # Heuristic warnings (few layers, zero offsets) stay
+            # informational; the empty-trace case already exited above
+            verify_format(entries)
+        elif args.stats:
+            show_statistics(entries, arr)
+        else:
+            display_entries(entries, args.limit if args.limit > 0 else 10)
+            if args.limit == 0:
+                print(f"\n... ({num_entries - 10} more entries, use --limit to show more)")
+    finally:
+        # Drop our views before closing the mapping. On the exception
+        # path a traceback frame may still hold one, making close()
+        # raise BufferError and mask the real error — close
+        # best-effort; the mapping is released at process exit anyway.
+        del arr, entries
+        if mm is not None:
+            try:
+                mm.close()
+            except BufferError:
+                pass
 
     return 0
 
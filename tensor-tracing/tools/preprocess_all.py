@@ -47,16 +47,27 @@ import argparse
 import os
 import sys
 import subprocess
-import glob
 import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Tuple
 
+# The parser scripts live next to this one; import them directly so a
+# token doesn't pay interpreter startup for every conversion
+sys.path.insert(0, str(Path(__file__).parent))
+import parse_dot  # noqa: E402
+import parse_trace  # noqa: E402
 
+
+@lru_cache(maxsize=None)
 def find_script(script_name: str) -> Path:
     """
     Find a preprocessing script in the tools directory.
 
+    Cached: the location never changes within a run, so repeat lookups
+    skip the exists() stat.
+
     Args:
         script_name: Name of script (e.g., "parse_csv.py")
 
@@ -76,6 +87,10 @@ def find_script(script_name: str) -> Path:
     return script_path
 
 
+# Matches graph files like "token_00000.dot", "token_00001.dot", etc.
+_TOKEN_DOT_RE = re.compile(r'token_(\d+)\.dot$')
+
+
 def detect_available_tokens(graphs_dir: Path) -> List[int]:
     """
     Auto-detect available token IDs from graph files.
@@ -88,14 +103,13 @@ def detect_available_tokens(graphs_dir: Path) -> List[int]:
     """
     token_ids = []
 
-    # Look for files like "token_00000.dot", "token_00001.dot", etc.
-    pattern = graphs_dir / "token_*.dot"
-    for dot_file in glob.glob(str(pattern)):
-        filename = Path(dot_file).name
-        match = re.search(r'token_(\d+)\.dot', filename)
-        if match:
-            token_id = int(match.group(1))
-            token_ids.append(token_id)
+    # scandir reads names straight from the directory entries without
+    # the per-file stat that glob performs
+    with os.scandir(graphs_dir) as it:
+        for entry in it:
+            match = _TOKEN_DOT_RE.match(entry.name)
+            if match:
+                token_ids.append(int(match.group(1)))
 
     return sorted(token_ids)
 
@@ -216,90 +230,97 @@ def preprocess_memory_map(csv_path: Path, output_dir: Path, verbose: bool = True
     return success
 
 
+def preprocess_traces(trace_file: Path, output_dir: Path, verbose: bool = True) -> bool:
+    """
+    Export all per-token trace JSONs in one pass over the binary trace.
+
+    parse_trace's --export-json parses the file once and writes every
+    token-XXXXX.json, instead of re-parsing the whole multi-GB trace
+    once per token.
+
+    Args:
+        trace_file: Path to binary trace file
+        output_dir: Output directory (token files go under traces/)
+        verbose: Print progress messages
+
+    Returns:
+        True if successful
+    """
+    traces_dir = output_dir / "traces"
+    if verbose:
+        print("\n" + "="*60)
+        print("STEP 2: Exporting Traces (single pass)")
+        print("="*60)
+        print(f"Input:  {trace_file}")
+        print(f"Output: {traces_dir}/")
+
+    try:
+        rc = parse_trace.main([str(trace_file), '--export-json', str(traces_dir)])
+    except Exception as e:
+        print(f"✗ Error: parse_trace export failed: {e}")
+        return False
+    if rc != 0:
+        print(f"✗ Error: parse_trace export exited with {rc}")
+    return rc == 0
+
+
 def preprocess_token(
     token_id: int,
     graphs_dir: Path,
-    trace_file: Path,
     output_dir: Path,
     verbose: bool = True
-) -> Tuple[bool, bool]:
+) -> bool:
     """
-    Preprocess a single token (graph + trace).
+    Preprocess a single token's graph.
+
+    The per-token trace JSON is produced by preprocess_traces in one
+    pass over the whole trace file.
 
     Args:
         token_id: Token ID to process
         graphs_dir: Directory containing .dot files
-        trace_file: Path to binary trace file
         output_dir: Output directory
         verbose: Print progress messages
 
     Returns:
-        Tuple of (graph_success, trace_success)
+        True if the graph was converted successfully
     """
+    # Collect progress lines and print them in one call at the end so
+    # tokens running in parallel don't interleave their output
+    lines = []
     if verbose:
-        print(f"\n{'─'*60}")
-        print(f"Processing Token {token_id:05d}")
-        print(f"{'─'*60}")
+        lines.append(f"\n{'─'*60}")
+        lines.append(f"Processing Token {token_id:05d}")
+        lines.append(f"{'─'*60}")
 
     graph_success = False
-    trace_success = False
 
-    # 1. Process graph
+    # Process graph
     dot_file = graphs_dir / f"token_{token_id:05d}.dot"
     graph_output = output_dir / "graphs" / f"token-{token_id:05d}.json"
 
     if dot_file.exists():
         if verbose:
-            print(f"Graph:  {dot_file.name} → {graph_output.name}")
-
-        parse_dot = find_script("parse_dot.py")
-        cmd = [
-            sys.executable,
-            str(parse_dot),
-            "--dot", str(dot_file),
-            "--output", str(graph_output),
-            "--pretty"
-        ]
-
-        graph_success, error = run_command(cmd, f"parse_dot.py (token {token_id})")
+            lines.append(f"Graph:  {dot_file.name} → {graph_output.name}")
+
+        # Direct call instead of a subprocess: skips a fork/exec plus
+        # interpreter startup per token
+        try:
+            parse_dot.convert_file(str(dot_file), str(graph_output),
+                                   pretty=True, verbose=False)
+            graph_success = True
+        except Exception as e:
+            error = f"parse_dot (token {token_id}) failed: {e}"
         if graph_success:
             size_kb = graph_output.stat().st_size / 1024
-            print(f"  ✓ Graph JSON: {size_kb:.1f} KB")
-        else:
-            print(f"  ✗ Graph failed: {error}")
-    else:
-        print(f"  ⚠ Graph file not found: {dot_file}")
-
-    # 2. Process trace
-    trace_output = output_dir / "traces" / f"token-{token_id:05d}.json"
-
-    if trace_file.exists():
-        if verbose:
-            print(f"Trace:  {trace_file.name} (token {token_id}) → {trace_output.name}")
-
-        parse_trace = find_script("parse_trace.py")
-        cmd = [
-            sys.executable,
-            str(parse_trace),
-            str(trace_file),
-            "--token", str(token_id),
-            "--format", "json",
-            "--output", str(trace_output)
-        ]
-
-        trace_success, error = run_command(cmd, f"parse_trace.py (token {token_id})")
-        if trace_success and trace_output.exists():
-            size_kb = trace_output.stat().st_size / 1024
-            print(f"  ✓ Trace JSON: {size_kb:.1f} KB")
-        elif trace_success:
-            print(f"  ⚠ Trace completed but output file not found")
-            trace_success = False
+            lines.append(f"  ✓ Graph JSON: {size_kb:.1f} KB")
         else:
-            print(f"  ✗ Trace failed: {error}")
+            lines.append(f"  ✗ Graph failed: {error}")
     else:
-        print(f"  ⚠ Trace file not found: {trace_file}")
+        lines.append(f"  ⚠ Graph file not found: {dot_file}")
 
-    return graph_success, trace_success
+    print('\n'.join(lines))
+    return graph_success
 
 
 def main():
@@ -362,6 +383,12 @@ Examples:
         action='store_true',
         help='Skip memory map generation (if already exists)'
     )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=os.cpu_count(),
+        help='Number of tokens to process in parallel (default: CPU count)'
+    )
     parser.add_argument(
         '--quiet',
         action='store_true',
@@ -441,22 +468,37 @@ Examples:
         if verbose:
             print("\nNo buffer stats file provided (use --buffer-stats to include)")
 
-    # Step 2: Process each token
+    # Step 2: Export all per-token traces in one pass over the trace
+    # file (parse_trace groups entries by token internally)
+    trace_export_ok = preprocess_traces(args.trace, args.output, verbose)
+    if not trace_export_ok:
+        print("\nWarning: Trace export failed. Continuing with graphs...")
+
+    # Step 3: Process each token's graph
     if verbose:
         print("\n" + "="*60)
-        print(f"STEP 2: Processing {len(token_ids)} Tokens")
+        print(f"STEP 3: Processing {len(token_ids)} Token Graphs")
         print("="*60)
 
+    # Tokens are independent (different .dot in, different .json out),
+    # so convert them in parallel. Processes, not threads: the .dot
+    # parsing runs in this interpreter since the import refactor, so
+    # threads would serialize on the GIL.
     results = []
-    for token_id in token_ids:
-        graph_ok, trace_ok = preprocess_token(
-            token_id,
-            args.graphs,
-            args.trace,
-            args.output,
-            verbose
-        )
-        results.append((token_id, graph_ok, trace_ok))
+    traces_dir = args.output / "traces"
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        futures = {
+            executor.submit(
+                preprocess_token, token_id, args.graphs,
+                args.output, verbose): token_id
+            for token_id in token_ids
+        }
+        for future in as_completed(futures):
+            token_id = futures[future]
+            graph_ok = future.result()
+            trace_ok = (traces_dir / f"token-{token_id:05d}.json").exists()
+            results.append((token_id, graph_ok, trace_ok))
+    results.sort()
 
     # Summary
     if verbose: